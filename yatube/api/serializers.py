@@ -0,0 +1,52 @@
+def user_data(user):
+    return {
+        'id': user.pk,
+        'username': user.username,
+        'name': user.get_full_name(),
+    }
+
+
+def group_data(group):
+    if group is None:
+        return None
+    return {
+        'slug': group.slug,
+        'title': group.title,
+    }
+
+
+def post_data(post):
+    return {
+        'id': post.pk,
+        'text': post.text,
+        'pub_date': post.pub_date.isoformat(),
+        'author': user_data(post.author),
+        'group': group_data(post.group),
+        'image': post.image.url if post.image else None,
+        'comment_count': post.comment_count,
+    }
+
+
+def comment_data(comment):
+    return {
+        'id': comment.pk,
+        'text': comment.text,
+        'pub_date': comment.pub_date.isoformat(),
+        'author': user_data(comment.author),
+    }
+
+
+def page_data(request, page, serialize):
+    """Страница курсорной пагинации со ссылками на соседние страницы."""
+    def link(cursor):
+        if not cursor:
+            return None
+        params = request.GET.copy()
+        params['cursor'] = cursor
+        return f'{request.path}?{params.urlencode()}'
+
+    return {
+        'results': [serialize(item) for item in page],
+        'next': link(page.next_cursor),
+        'previous': link(page.previous_cursor),
+    }
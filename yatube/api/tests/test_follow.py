@@ -0,0 +1,68 @@
+import json
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Follow, User
+
+
+class FollowBulkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        for number in range(3):
+            User.objects.create_user(username=f'author{number}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+        self.url = reverse('api:follow_bulk')
+
+    def post(self, data, client=None):
+        return (client or self.client).post(
+            self.url, json.dumps(data), content_type='application/json')
+
+    def following(self):
+        return set(Follow.objects.filter(user=self.reader).values_list(
+            'author__username', flat=True))
+
+    def test_follow_and_unfollow(self):
+        """Подписка и отписка списком имен"""
+        response = self.post({
+            'follow': ['author0', 'author1', 'reader', 'nobody']})
+        self.assertEqual(response.json(), {
+            'followed': ['author0', 'author1'], 'unfollowed': []})
+        response = self.post({
+            'follow': ['author1', 'author2'], 'unfollow': ['author0']})
+        self.assertEqual(response.json(), {
+            'followed': ['author2'], 'unfollowed': ['author0']})
+        self.assertEqual(self.following(), {'author1', 'author2'})
+
+    def test_errors(self):
+        """Некорректные запросы отклоняются без изменений"""
+        cases = {
+            'json': 'not json',
+            'object': json.dumps(['author0']),
+            'list': json.dumps({'follow': 'author0'}),
+            'both': json.dumps({'follow': ['author0'],
+                                'unfollow': ['author0']}),
+        }
+        for name, body in cases.items():
+            with self.subTest(case=name):
+                response = self.client.post(
+                    self.url, body, content_type='application/json')
+                self.assertEqual(response.status_code, 400)
+        with override_settings(BULK_FOLLOW_LIMIT=2):
+            response = self.post({'follow': ['author0', 'author1'],
+                                  'unfollow': ['author2']})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.following(), set())
+
+    def test_methods_and_auth(self):
+        """Только POST и только для авторизованных"""
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+        response = self.post({'follow': ['author0']}, client=Client())
+        self.assertEqual(response.status_code, 401)
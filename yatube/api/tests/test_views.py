@@ -0,0 +1,122 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+
+
+class ApiViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='testauthor', first_name='Тест', last_name='Автор')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.author,
+        )
+        for number in range(13):
+            cls.post = Post.objects.create(
+                author=cls.author,
+                text=f'Тестовый пост {number}',
+                group=cls.group,
+            )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds(self):
+        """Ленты отдают посты автора в JSON"""
+        urls = (
+            (self.guest_client, reverse('api:index')),
+            (self.guest_client, reverse(
+                'api:group_posts', args=(self.group.slug,))),
+            (self.guest_client, reverse(
+                'api:profile_posts', args=(self.author.username,))),
+            (self.reader_client, reverse('api:follow_posts')),
+        )
+        for client, url in urls:
+            with self.subTest(url=url):
+                data = client.get(url).json()
+                self.assertEqual(data['results'][0], {
+                    'id': self.post.pk,
+                    'text': self.post.text,
+                    'pub_date': self.post.pub_date.isoformat(),
+                    'author': {
+                        'id': self.author.pk,
+                        'username': 'testauthor',
+                        'name': 'Тест Автор',
+                    },
+                    'group': {'slug': 'testslug', 'title': 'Тестовая группа'},
+                    'image': None,
+                    'comment_count': 1,
+                })
+
+    def test_cursor_pagination(self):
+        """Курсоры проходят ленту целиком без повторов"""
+        url, ids = reverse('api:index'), []
+        while url:
+            data = self.guest_client.get(url).json()
+            ids += [post['id'] for post in data['results']]
+            url = data['next']
+        self.assertEqual(ids, list(Post.objects.values_list('pk', flat=True)))
+
+    def test_post_detail(self):
+        """Пост отдается вместе с первой страницей комментариев"""
+        data = self.guest_client.get(
+            reverse('api:post_detail', args=(self.post.pk,))).json()
+        self.assertEqual(data['post']['id'], self.post.pk)
+        self.assertEqual(
+            [comment['text'] for comment in data['comments']['results']],
+            ['Комментарий'])
+
+    def test_not_found_is_json(self):
+        """Несуществующие объекты дают 404 в JSON"""
+        urls = (
+            reverse('api:post_detail', args=(99999,)),
+            reverse('api:group_posts', args=('nogroup',)),
+            reverse('api:profile_posts', args=('nobody',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response['Content-Type'], 'application/json')
+                self.assertIn('detail', response.json())
+                self.assertFalse(response.has_header('ETag'))
+
+    def test_conditional_get(self):
+        """Повторный запрос с If-None-Match получает 304 без запросов к БД"""
+        url = reverse('api:index')
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        Post.objects.create(author=self.author, text='Новый пост')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_follow_requires_login(self):
+        """Лента подписок доступна только авторизованным"""
+        response = self.guest_client.get(reverse('api:follow_posts'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_follow_etag_changes_on_follow(self):
+        """Подписка меняет ETag ленты подписок"""
+        url = reverse('api:follow_posts')
+        etag = self.reader_client.get(url)['ETag']
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=self.reader, author=other)
+        response = self.reader_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
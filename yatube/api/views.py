@@ -0,0 +1,187 @@
+import hashlib
+import json
+from functools import wraps
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.views.decorators.http import require_POST, require_safe
+
+from core.cache import get_cached_or_404
+from core.middleware import query_budget
+from posts import follows
+from posts.cache import feed_version, tag_versions
+from posts.models import Group, Post, User
+from posts.utils import paging
+from .serializers import comment_data, page_data, post_data
+
+
+def conditional(validators):
+    """Отвечает 304 по If-None-Match, не выполняя view.
+
+    validators(request, **kwargs) возвращает дешевые версии данных, от
+    которых зависит ответ (поколение лент, версии тегов кеша); из них и
+    адреса запроса строится ETag. Совпадение версий означает тот же ответ.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = '"{}"'.format(hashlib.md5(json.dumps(
+                [request.get_full_path(), validators(request, **kwargs)],
+                default=str,
+            ).encode()).hexdigest())
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def login_required(view):
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse(
+                {'detail': 'Требуется авторизация.'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def json_not_found(view):
+    """Отдает 404 в JSON вместо HTML-страницы сайта."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except Http404:
+            return JsonResponse({'detail': 'Не найдено.'}, status=404)
+    return wrapper
+
+
+def _bad_request(detail):
+    return JsonResponse({'detail': detail}, status=400)
+
+
+def _feed(request, posts):
+    page = paging(
+        request, posts.select_related('author', 'group'), cursor=True)
+    return JsonResponse(page_data(request, page, post_data))
+
+
+def _feed_version(request, **kwargs):
+    # Комментарии не меняют поколение лент, а счетчик есть в каждом посте.
+    return [feed_version(), tag_versions(['comments'])]
+
+
+@require_safe
+@query_budget(3)
+@conditional(_feed_version)
+def index(request):
+    return _feed(request, Post.objects.all())
+
+
+@require_safe
+@query_budget(4)
+@conditional(_feed_version)
+@json_not_found
+def group_posts(request, slug):
+    group = get_cached_or_404(Group, slug=slug)
+    return _feed(request, group.posts.all())
+
+
+@require_safe
+@query_budget(4)
+@conditional(_feed_version)
+@json_not_found
+def profile_posts(request, username):
+    author = get_cached_or_404(User, username=username)
+    return _feed(request, author.posts.all())
+
+
+def _follow_versions(request, **kwargs):
+    return [feed_version(), request.user.pk, tag_versions(
+        [f'author:{request.user.pk}', 'comments'])]
+
+
+@require_safe
+@query_budget(4)
+@login_required
+@conditional(_follow_versions)
+def follow_posts(request):
+    entries = request.user.timeline.select_related(
+        'post__author', 'post__group')
+    page = paging(request, entries, cursor=True)
+    page.object_list = [entry.post for entry in page]
+    return JsonResponse(page_data(request, page, post_data))
+
+
+def _post_versions(request, post_id):
+    return [feed_version(), tag_versions([f'comments:{post_id}'])]
+
+
+@require_safe
+@query_budget(4)
+@conditional(_post_versions)
+@json_not_found
+def post_detail(request, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'), pk=post_id)
+    comments = paging(
+        request,
+        post.comments.select_related('author'),
+        cursor=True,
+        per_page=settings.COMMENTS_LIMIT,
+    )
+    return JsonResponse({
+        'post': post_data(post),
+        'comments': page_data(request, comments, comment_data),
+    })
+
+
+def _usernames(data, key):
+    names = data.get(key, [])
+    if not isinstance(names, list) or not all(
+            isinstance(name, str) for name in names):
+        raise ValueError(f'{key}: ожидается список имен пользователей.')
+    return set(names)
+
+
+@require_POST
+@query_budget(25)
+@login_required
+def follow_bulk(request):
+    """Подписка и отписка списками: {"follow": [...], "unfollow": [...]}.
+
+    Неизвестные имена, себя и повторные подписки пропускает; в ответе
+    только авторы, для которых подписка действительно изменилась.
+    """
+    try:
+        data = json.loads(request.body)
+        if not isinstance(data, dict):
+            raise ValueError('Ожидается JSON-объект.')
+        follow, unfollow = (
+            _usernames(data, key) for key in ('follow', 'unfollow'))
+    except json.JSONDecodeError:
+        return _bad_request('Некорректный JSON.')
+    except ValueError as error:
+        return _bad_request(str(error))
+    if follow & unfollow:
+        return _bad_request('Автор не может быть в обоих списках.')
+    if len(follow) + len(unfollow) > settings.BULK_FOLLOW_LIMIT:
+        return _bad_request(
+            f'Не больше {settings.BULK_FOLLOW_LIMIT} авторов за запрос.')
+    authors = dict(User.objects.filter(
+        username__in=follow | unfollow).values_list('pk', 'username'))
+    followed = follows.follow_many(request.user, [
+        pk for pk, username in authors.items() if username in follow])
+    unfollowed = follows.unfollow_many(request.user, [
+        pk for pk, username in authors.items() if username in unfollow])
+    return JsonResponse({
+        'followed': sorted(authors[pk] for pk in followed),
+        'unfollowed': sorted(authors[pk] for pk in unfollowed),
+    })
@@ -0,0 +1,80 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.http import Http404
+
+OBJECT_KEY = 'core:object:{}:{}:{}'
+OBJECT_STATS_KEY = 'core:object_cache:{}'
+
+# Метка отсутствующего объекта: 404 тоже кешируются, но ненадолго.
+MISSING = 'missing'
+
+
+def _key(model, field, value):
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return OBJECT_KEY.format(model._meta.label_lower, field, digest)
+
+
+def _count(outcome):
+    key = OBJECT_STATS_KEY.format(outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def get_cached(model, **lookup):
+    """Достает объект по уникальному полю через кеш.
+
+    Отсутствие объекта тоже запоминается, чтобы перебор несуществующих
+    адресов не доходил до базы.
+    """
+    (field, value), = lookup.items()
+    key = _key(model, field, value)
+    obj = cache.get(key)
+    if obj == MISSING:
+        _count('negative_hits')
+        raise model.DoesNotExist(
+            f'{model._meta.object_name} {field}={value!r} не найден')
+    if obj is not None:
+        _count('hits')
+        return obj
+    _count('misses')
+    try:
+        # Кеш живет долго и сбрасывается только при записи, поэтому
+        # заполняется с основной базы, а не с отстающей реплики.
+        obj = model._default_manager.using(DEFAULT_DB_ALIAS).get(**lookup)
+    except model.DoesNotExist:
+        cache.set(key, MISSING, settings.OBJECT_CACHE_MISS_TIMEOUT)
+        raise
+    cache.set(key, obj, settings.OBJECT_CACHE_TIMEOUT)
+    return obj
+
+
+def get_cached_or_404(model, **lookup):
+    try:
+        return get_cached(model, **lookup)
+    except model.DoesNotExist:
+        raise Http404(f'{model._meta.object_name} не найден')
+
+
+def invalidate(model, field, *values):
+    """Сбрасывает закешированные объекты (и 404) по значениям поля."""
+    cache.delete_many([_key(model, field, value) for value in values])
+
+
+def object_cache_stats():
+    hits, negative_hits, misses = (
+        cache.get(OBJECT_STATS_KEY.format(outcome), 0)
+        for outcome in ('hits', 'negative_hits', 'misses')
+    )
+    total = hits + negative_hits + misses
+    return {
+        'hits': hits,
+        'negative_hits': negative_hits,
+        'misses': misses,
+        'ratio': (hits + negative_hits) / total if total else 0.0,
+    }
@@ -0,0 +1,12 @@
+from django.conf import settings
+
+from core.db_router import versioned_timeout
+
+
+def timeouts(request):
+    """Добавляет сроки жизни кешированных фрагментов шаблонов."""
+    return {
+        'feed_cache_timeout': versioned_timeout(
+            settings.FEED_CACHE_TIMEOUT),
+        'post_cache_timeout': settings.POST_CACHE_TIMEOUT,
+    }
@@ -0,0 +1,75 @@
+import random
+from contextlib import contextmanager
+from threading import local
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_state = local()
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Разрешает чтение с реплики на время блока.
+
+    Реплика выбирается одна на весь блок, чтобы запрос не видел разные
+    состояния разных реплик. Первая же запись в блоке возвращает чтение
+    на основную базу, чтобы запрос видел собственные изменения. В
+    state['wrote'] после блока видно, была ли запись, а в
+    state['read_replica'] — было ли чтение с реплики.
+    """
+    previous = getattr(_state, 'current', None)
+    replica = None
+    if enabled and settings.DATABASE_REPLICAS:
+        replica = random.choice(settings.DATABASE_REPLICAS)
+    state = _state.current = {
+        'replica': replica, 'wrote': False, 'read_replica': False}
+    try:
+        yield state
+    finally:
+        _state.current = previous
+
+
+def read_from_replica():
+    """Читал ли текущий запрос что-нибудь с реплики."""
+    state = getattr(_state, 'current', None)
+    return bool(state and state['read_replica'])
+
+
+def versioned_timeout(timeout):
+    """Срок хранения в кеше данных, сохраняемых под версией или тегами.
+
+    Версии меняются на основной базе, а реплика может от нее отставать:
+    прочитанное с реплики хранится не дольше REPLICA_PIN_SECONDS, за
+    которые реплика должна догнать основную базу.
+    """
+    if read_from_replica():
+        return min(timeout, settings.REPLICA_PIN_SECONDS)
+    return timeout
+
+
+class ReplicaRouter:
+    """Отправляет чтение на реплику, выбранную в replica_reads, а запись
+    и все остальное — на основную базу."""
+
+    def db_for_read(self, model, **hints):
+        state = getattr(_state, 'current', None)
+        if (state is None or state['replica'] is None
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        state['read_replica'] = True
+        return state['replica']
+
+    def db_for_write(self, model, **hints):
+        state = getattr(_state, 'current', None)
+        if state is not None:
+            state['replica'] = None
+            state['wrote'] = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и основная база.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.cache import object_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кеш объектов.'
+
+    def handle(self, *args, **options):
+        stats = object_cache_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, '
+            f'попаданий в 404: {stats["negative_hits"]}, '
+            f'промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["ratio"]:.1%}')
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from core.middleware import (
+    profiling_rate, profiling_token, set_profiling_rate)
+
+
+class Command(BaseCommand):
+    help = ('Включает и выключает выборочное профилирование запросов '
+            'без перезапуска сервера.')
+
+    def add_arguments(self, parser):
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument(
+            '--rate', type=float,
+            help='Доля профилируемых запросов, от 0 до 1.')
+        group.add_argument(
+            '--off', action='store_true',
+            help='Выключить профилирование.')
+        group.add_argument(
+            '--reset', action='store_true',
+            help='Вернуться к PROFILING_SAMPLE_RATE из настроек.')
+        group.add_argument(
+            '--token', action='store_true',
+            help='Выдать значение заголовка X-Profile.')
+
+    def handle(self, *args, **options):
+        if options['token']:
+            self.stdout.write(profiling_token())
+            return
+        if options['off']:
+            set_profiling_rate(0)
+        elif options['reset']:
+            set_profiling_rate(None)
+        elif options['rate'] is not None:
+            set_profiling_rate(min(max(options['rate'], 0), 1))
+        self.stdout.write(self.style.SUCCESS(
+            f'Профилируется доля запросов: {profiling_rate():.2%}'))
@@ -0,0 +1,198 @@
+import cProfile
+import logging
+import os
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import connections
+
+from .db_router import replica_reads
+
+logger = logging.getLogger('yatube.requests')
+
+PROFILING_RATE_KEY = 'core:profiling:rate'
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_SALT = 'core.profiling'
+
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class QueryBudgetExceeded(Exception):
+    """View выполнила больше запросов к БД, чем объявила."""
+
+
+def query_budget(limit):
+    """Объявляет, сколько запросов к БД может выполнить view."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+class QueryBudgetMiddleware:
+    """Считает запросы к БД и время их выполнения для каждого запроса.
+
+    Итоги уходят в заголовок Server-Timing и в лог yatube.requests.
+    Превышение бюджета из query_budget пишется в лог предупреждением,
+    а при QUERY_BUDGET_RAISE приводит к исключению.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = {'queries': 0, 'time': 0.0}
+
+        def wrapper(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                stats['queries'] += 1
+                stats['time'] += time.perf_counter() - started
+
+        request.query_budget = None
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(wrapper))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        response['Server-Timing'] = (
+            f'db;dur={stats["time"] * 1000:.2f};'
+            f'desc="{stats["queries"]} queries", '
+            f'app;dur={total * 1000:.2f}')
+        self.report(request, response, stats, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+
+    def report(self, request, response, stats, total):
+        match = request.resolver_match
+        budget = request.query_budget
+        fields = {
+            'view': match.view_name if match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats['queries'],
+            'db_ms': round(stats['time'] * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+            'budget': budget,
+        }
+        line = ' '.join(f'{key}={value}' for key, value in fields.items())
+        if budget is None or stats['queries'] <= budget:
+            logger.info(line, extra=fields)
+            return
+        logger.warning(f'query budget exceeded {line}', extra=fields)
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(
+                f'{fields["view"]}: {stats["queries"]} запросов '
+                f'при бюджете {budget}')
+
+
+def profiling_rate():
+    """Доля профилируемых запросов: значение из кеша важнее настройки."""
+    rate = cache.get(PROFILING_RATE_KEY)
+    return settings.PROFILING_SAMPLE_RATE if rate is None else rate
+
+
+def set_profiling_rate(rate):
+    """Меняет долю профилируемых запросов без перезапуска; None — сброс."""
+    if rate is None:
+        cache.delete(PROFILING_RATE_KEY)
+    else:
+        cache.set(PROFILING_RATE_KEY, rate, None)
+
+
+def profiling_token():
+    """Подписанное значение заголовка X-Profile для принудительного
+    профилирования запроса."""
+    return signing.TimestampSigner(salt=PROFILING_SALT).sign('profile')
+
+
+class ProfilingMiddleware:
+    """Профилирует cProfile часть запросов и запросы с X-Profile.
+
+    Результаты пишутся в PROFILING_DIR/<view>/*.pstats; для каждой view
+    хранится не больше PROFILING_KEEP последних файлов.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        self.save(request, profiler)
+        return response
+
+    def should_profile(self, request):
+        token = request.META.get(PROFILING_HEADER)
+        if token:
+            try:
+                signing.TimestampSigner(salt=PROFILING_SALT).unsign(
+                    token, max_age=settings.PROFILING_TOKEN_MAX_AGE)
+                return True
+            except signing.BadSignature:
+                pass
+        rate = profiling_rate()
+        return rate > 0 and random.random() < rate
+
+    def save(self, request, profiler):
+        match = request.resolver_match
+        name = match.view_name.replace(':', '.') if match else 'unresolved'
+        directory = os.path.join(settings.PROFILING_DIR, name)
+        os.makedirs(directory, exist_ok=True)
+        profiler.dump_stats(os.path.join(
+            directory, f'{time.time():.6f}-{os.getpid()}.pstats'))
+        files = sorted(os.listdir(directory))
+        for old in files[:-settings.PROFILING_KEEP]:
+            try:
+                os.remove(os.path.join(directory, old))
+            except FileNotFoundError:
+                pass
+
+
+class ReplicaMiddleware:
+    """Читает данные безопасных запросов с реплик.
+
+    После записи в базу пользователь получает куку и следующие
+    REPLICA_PIN_SECONDS читает с основной базы: отставание реплики не
+    прячет от него только что созданный пост, комментарий или подписку.
+
+    ETag страниц строятся по версиям кеша, которые меняются на основной
+    базе, поэтому ответ, собранный по реплике, уходит без ETag.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = (
+            request.method in REPLICA_SAFE_METHODS
+            and REPLICA_PIN_COOKIE not in request.COOKIES)
+        with replica_reads(replicas) as state:
+            response = self.get_response(request)
+        if state['read_replica'] and response.status_code == 200:
+            del response['ETag']
+        if state['wrote']:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, User
+from ..cache import get_cached, object_cache_stats
+
+
+class ObjectCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.user,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_read_through(self):
+        """Повторное чтение объекта не обращается к базе"""
+        get_cached(Group, slug='testslug')
+        with self.assertNumQueries(0):
+            group = get_cached(Group, slug='testslug')
+        self.assertEqual(group, self.group)
+        self.assertEqual(object_cache_stats()['hits'], 1)
+        self.assertEqual(object_cache_stats()['misses'], 1)
+
+    def test_negative_cache(self):
+        """Отсутствующий объект запоминается до его создания"""
+        url = reverse('posts:profile', args=('nobody',))
+        self.assertEqual(self.guest_client.get(url).status_code, 404)
+        negative_hits = object_cache_stats()['negative_hits']
+        with self.assertNumQueries(0):
+            self.assertRaises(
+                User.DoesNotExist, get_cached, User, username='nobody')
+        self.assertEqual(
+            object_cache_stats()['negative_hits'], negative_hits + 1)
+        User.objects.create_user(username='nobody')
+        self.assertEqual(self.guest_client.get(url).status_code, 200)
+
+    def test_invalidation(self):
+        """Переименование и удаление сбрасывают кеш старого и нового ключа"""
+        get_cached(Group, slug='testslug')
+        self.assertRaises(
+            Group.DoesNotExist, get_cached, Group, slug='newslug')
+        group = Group.objects.get(pk=self.group.pk)
+        group.slug = 'newslug'
+        group.save()
+        self.assertRaises(
+            Group.DoesNotExist, get_cached, Group, slug='testslug')
+        self.assertEqual(get_cached(Group, slug='newslug').pk, group.pk)
+        group.delete()
+        self.assertRaises(
+            Group.DoesNotExist, get_cached, Group, slug='newslug')
+
+    def test_login_keeps_cached_user(self):
+        """Обновление last_login не требует лишнего запроса"""
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            user.save(update_fields=['last_login'])
@@ -0,0 +1,144 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory, SimpleTestCase, TestCase, override_settings)
+from django.views.decorators.http import condition
+
+from api.views import conditional
+from posts.cache import add_cache_tags, cache_anonymous_page
+from posts.models import Group, User
+from ..db_router import (
+    ReplicaRouter, read_from_replica, replica_reads, versioned_timeout)
+from ..middleware import REPLICA_PIN_COOKIE, ReplicaMiddleware
+
+
+@override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+
+    def run_view(self, request, view):
+        seen = []
+
+        def get_response(request):
+            return view(request, seen) or HttpResponse()
+
+        response = ReplicaMiddleware(get_response)(request)
+        return response, seen
+
+    def test_outside_requests(self):
+        """Вне запроса чтение идет с основной базы"""
+        self.assertEqual(self.router.db_for_read(Group), 'default')
+
+    def test_reads_from_replicas(self):
+        """Безопасные запросы читают с реплик"""
+        def view(request, seen):
+            seen.append(self.router.db_for_read(Group))
+
+        for method in ('get', 'head', 'options'):
+            with self.subTest(method=method):
+                response, seen = self.run_view(
+                    getattr(self.factory, method)('/'), view)
+                self.assertIn(seen[0], ('replica1', 'replica2'))
+                self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_one_replica_per_request(self):
+        """Все чтения запроса идут на одну реплику"""
+        def view(request, seen):
+            seen.extend(self.router.db_for_read(Group) for _ in range(20))
+
+        for _ in range(5):
+            self.assertEqual(
+                len(set(self.run_view(self.factory.get('/'), view)[1])), 1)
+
+    def test_replica_read_tracked(self):
+        """Чтение с реплики отмечается и сокращает срок версионного кеша"""
+        def view(request, seen):
+            seen.append((read_from_replica(), versioned_timeout(3600)))
+            self.router.db_for_read(Group)
+            seen.append((read_from_replica(), versioned_timeout(3600)))
+
+        self.assertEqual(
+            self.run_view(self.factory.get('/'), view)[1],
+            [(False, 3600), (True, 10)])
+        self.assertFalse(read_from_replica())
+
+    def test_no_etag_after_replica_read(self):
+        """Ответ, собранный по реплике, не получает ETag версий"""
+        cache.clear()
+
+        def record(request, replica):
+            if replica:
+                self.router.db_for_read(Group)
+            add_cache_tags(request, 'index')
+            return HttpResponse()
+
+        page = cache_anonymous_page(condition(
+            etag_func=lambda request, replica: 'v1')(record))
+        api = conditional(lambda request, replica: 1)(record)
+        for view in (page, api):
+            for replica in (True, False):
+                cache.clear()
+                request = self.factory.get('/')
+                request.user = AnonymousUser()
+                response, _ = self.run_view(
+                    request, lambda request, _: view(request, replica=replica))
+                with self.subTest(view=view, replica=replica):
+                    self.assertEqual(response.has_header('ETag'), not replica)
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Без реплик все читается с основной базы"""
+        def view(request, seen):
+            seen.append(self.router.db_for_read(Group))
+
+        self.assertEqual(
+            self.run_view(self.factory.get('/'), view)[1], ['default'])
+
+    def test_write_pins_to_primary(self):
+        """После записи запрос и следующие запросы читают с основной базы"""
+        def view(request, seen):
+            seen.append(self.router.db_for_read(Group))
+            seen.append(self.router.db_for_write(Group))
+            seen.append(self.router.db_for_read(Group))
+
+        response, seen = self.run_view(self.factory.get('/'), view)
+        self.assertIn(seen[0], ('replica1', 'replica2'))
+        self.assertEqual(seen[1:], ['default', 'default'])
+        cookie = response.cookies[REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], 10)
+
+        def read(request, seen):
+            seen.append(self.router.db_for_read(Group))
+
+        request = self.factory.get('/')
+        request.COOKIES[REPLICA_PIN_COOKIE] = cookie.value
+        self.assertEqual(self.run_view(request, read)[1], ['default'])
+
+    def test_unsafe_methods_use_primary(self):
+        """POST читает с основной базы"""
+        def view(request, seen):
+            seen.append(self.router.db_for_read(Group))
+
+        response, seen = self.run_view(self.factory.post('/'), view)
+        self.assertEqual(seen, ['default'])
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+    def test_migrations_only_on_primary(self):
+        """Миграции применяются только к основной базе"""
+        self.assertTrue(self.router.allow_migrate('default', 'posts'))
+        self.assertFalse(self.router.allow_migrate('replica1', 'posts'))
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaWritesTests(TestCase):
+    def test_real_write_detected(self):
+        """Запись через ORM замечается, а в транзакции чтение идет с
+        основной базы"""
+        router = ReplicaRouter()
+        with replica_reads() as state:
+            self.assertEqual(router.db_for_read(User), 'default')
+            User.objects.create_user(username='writer')
+        self.assertTrue(state['wrote'])
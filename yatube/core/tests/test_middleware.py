@@ -0,0 +1,158 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Follow, Group, Post, User
+from ..middleware import (
+    QueryBudgetExceeded, QueryBudgetMiddleware, profiling_token,
+    query_budget)
+
+PROFILING_DIR = tempfile.mkdtemp()
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def run_view(self, view):
+        middleware = QueryBudgetMiddleware(
+            lambda request: middleware.process_view(
+                request, view, (), {}) or view(request))
+        return middleware(self.factory.get('/'))
+
+    def test_server_timing_header(self):
+        """Число запросов и время БД попадают в Server-Timing"""
+        def view(request):
+            list(User.objects.all())
+            list(Group.objects.all())
+            return HttpResponse()
+
+        with self.assertLogs('yatube.requests', 'INFO') as logs:
+            response = self.run_view(view)
+        self.assertIn('desc="2 queries"', response['Server-Timing'])
+        self.assertIn('queries=2', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_RAISE=False)
+    def test_budget_warning(self):
+        """Превышение бюджета пишется в лог предупреждением"""
+        @query_budget(1)
+        def view(request):
+            list(User.objects.all())
+            list(Group.objects.all())
+            return HttpResponse()
+
+        with self.assertLogs('yatube.requests', 'WARNING') as logs:
+            self.run_view(view)
+        self.assertIn('query budget exceeded', logs.output[0])
+
+    @override_settings(QUERY_BUDGET_RAISE=True)
+    def test_budget_raises(self):
+        """С QUERY_BUDGET_RAISE превышение бюджета — ошибка"""
+        @query_budget(0)
+        def view(request):
+            list(User.objects.all())
+            return HttpResponse()
+
+        with self.assertLogs('yatube.requests', 'WARNING'):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.run_view(view)
+
+
+@override_settings(QUERY_BUDGET_RAISE=True)
+class PostsQueryBudgetTests(TestCase):
+    """Страницы posts укладываются в объявленные бюджеты запросов."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='testauthor')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.author,
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        for number in range(15):
+            post = Post.objects.create(
+                author=cls.author,
+                text=f'Тестовый пост {number}',
+                group=cls.group,
+            )
+            Comment.objects.create(
+                post=post, author=cls.reader, text='Комментарий')
+        cls.post = post
+
+    def test_pages_within_budget(self):
+        """Ленты и страницы поста не превышают бюджет"""
+        reader = Client()
+        reader.force_login(self.reader)
+        author = Client()
+        author.force_login(self.author)
+        pages = (
+            (Client(), reverse('posts:index')),
+            (reader, reverse('posts:index')),
+            (reader, reverse('posts:group_list', args=(self.group.slug,))),
+            (reader, reverse('posts:group_index')),
+            (reader, reverse('posts:search') + '?q=пост'),
+            (reader, reverse('posts:profile', args=(self.author.username,))),
+            (reader, reverse('posts:post_detail', args=(self.post.pk,))),
+            (reader, reverse('posts:follow_index')),
+            (author, reverse('posts:post_create')),
+            (author, reverse('posts:post_edit', args=(self.post.pk,))),
+        )
+        for client, url in pages:
+            with self.subTest(url=url):
+                self.assertEqual(client.get(url).status_code, 200)
+
+
+@override_settings(
+    PROFILING_DIR=PROFILING_DIR, PROFILING_SAMPLE_RATE=0, PROFILING_KEEP=2)
+class ProfilingMiddlewareTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        shutil.rmtree(PROFILING_DIR, ignore_errors=True)
+        self.guest_client = Client()
+        self.url = reverse('about:author')
+        self.directory = os.path.join(PROFILING_DIR, 'about.author')
+
+    def profiles(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return os.listdir(self.directory)
+
+    def test_disabled_by_default(self):
+        """При нулевой доле запросы не профилируются"""
+        self.guest_client.get(self.url)
+        self.assertEqual(self.profiles(), [])
+
+    def test_runtime_toggle_and_rotation(self):
+        """Доля меняется командой, старые профили удаляются"""
+        call_command('profiling', rate=1, stdout=StringIO())
+        for _ in range(3):
+            self.guest_client.get(self.url)
+        self.assertEqual(len(self.profiles()), 2)
+        self.assertTrue(self.profiles()[0].endswith('.pstats'))
+        call_command('profiling', off=True, stdout=StringIO())
+        self.guest_client.get(self.url)
+        self.assertEqual(len(self.profiles()), 2)
+
+    def test_signed_header(self):
+        """Запрос с подписанным X-Profile профилируется всегда"""
+        self.guest_client.get(self.url, HTTP_X_PROFILE='подделка')
+        self.assertEqual(self.profiles(), [])
+        self.guest_client.get(self.url, HTTP_X_PROFILE=profiling_token())
+        self.assertEqual(len(self.profiles()), 1)
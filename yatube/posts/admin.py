@@ -1,9 +1,20 @@
 from django.contrib import admin
 
-from .models import Group, Post, Comment, Follow
+from . import search
+from .models import Group, Post, Comment, Follow, FollowSuggestion
 
 
-class PostAdmin(admin.ModelAdmin):
+class FullTextSearchMixin:
+    """Поиск в админке по полнотекстовому индексу вместо icontains."""
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        ids = search.search_ids(self.model, search_term)
+        return queryset.filter(pk__in=ids), False
+
+
+class PostAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group')
     search_fields = ('text',)
     list_filter = ('pub_date',)
@@ -11,9 +22,9 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class GroupAdmin(admin.ModelAdmin):
+class GroupAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('pk', 'title', 'description')
-    search_fields = ('title',)
+    search_fields = ('title', 'description')
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -25,7 +36,13 @@ class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author')
 
 
+class FollowSuggestionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'author', 'score')
+    raw_id_fields = ('user', 'author')
+
+
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
 admin.site.register(Follow, FollowAdmin)
+admin.site.register(FollowSuggestion, FollowSuggestionAdmin)
@@ -1,5 +1,13 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from PIL import Image
+
+        from . import signals  # noqa: F401
+
+        Image.MAX_IMAGE_PIXELS = settings.POST_IMAGE_MAX_PIXELS
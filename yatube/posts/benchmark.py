@@ -0,0 +1,186 @@
+import json
+import math
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils.http import urlencode
+
+from . import urls
+from .models import Group, Post, UserStats
+
+# Маршруты, которые меняют данные даже на GET: их не замеряем.
+UNSAFE_ROUTES = {
+    'post_delete',
+    'add_comment',
+    'delete_comment',
+    'profile_follow',
+    'profile_unfollow',
+}
+
+# Маршруты, которые имеет смысл открывать только от имени автора поста.
+AUTHOR_ROUTES = {'post_edit'}
+
+# Отдельный кеш, чтобы замер не сбрасывал и не засорял рабочий.
+BENCHMARK_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'benchmark',
+    }
+}
+
+
+def isolated_cache():
+    """Подменяет CACHES на BENCHMARK_CACHES на время замера."""
+    return override_settings(CACHES=BENCHMARK_CACHES)
+
+
+@contextmanager
+def query_timer():
+    """Считает запросы к БД и их суммарное время в секундах."""
+    stats = {'queries': 0, 'time': 0.0}
+
+    def wrapper(execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats['queries'] += 1
+            stats['time'] += time.perf_counter() - started
+
+    with connection.execute_wrapper(wrapper):
+        yield stats
+
+
+def percentile(values, share):
+    """Перцентиль по методу ближайшего ранга."""
+    values = sorted(values)
+    return values[max(math.ceil(share * len(values)) - 1, 0)]
+
+
+def sample_kwargs():
+    """Аргументы маршрутов для самых «тяжелых» объектов в базе."""
+    author = UserStats.objects.select_related('user').order_by(
+        '-posts_count').first()
+    group = Group.objects.annotate(total=Count('posts')).order_by(
+        '-total').first()
+    post = Post.objects.annotate(total=Count('comments')).order_by(
+        '-total').first()
+    return {
+        'username': author and author.user.username,
+        'group_list': group and group.slug,
+        'post_id': post and post.pk,
+        'q': post and post.text.split()[0],
+    }
+
+
+def reader():
+    """Пользователь с самой длинной лентой подписок."""
+    stats = UserStats.objects.select_related('user').order_by(
+        '-follows_count').first()
+    return stats and stats.user
+
+
+def routes(kwargs):
+    """Имена и адреса замеряемых маршрутов из posts/urls.py."""
+    for pattern in urls.urlpatterns:
+        if pattern.name in UNSAFE_ROUTES:
+            continue
+        names = pattern.pattern.converters
+        if any(kwargs.get(name) is None for name in names):
+            continue
+        url = reverse(
+            f'{urls.app_name}:{pattern.name}',
+            kwargs={name: kwargs[name] for name in names})
+        if pattern.name == 'search':
+            url += '?' + urlencode({'q': kwargs['q'] or ''})
+        yield pattern.name, url
+
+
+def measure(client, url, repeat, warm=False):
+    """Замеряет запросы к БД и время ответа страницы.
+
+    Работает с кешем из BENCHMARK_CACHES, а не с настроенным в CACHES.
+    """
+    timings, sql_times = [], []
+    queries = status = None
+    with isolated_cache():
+        for _ in range(repeat):
+            if not warm:
+                cache.clear()
+            with query_timer() as stats:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append(time.perf_counter() - started)
+            sql_times.append(stats['time'])
+            queries, status = stats['queries'], response.status_code
+    return {
+        'status': status,
+        'queries': queries,
+        'sql_ms': round(percentile(sql_times, 0.5) * 1000, 2),
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+    }
+
+
+def _client(user):
+    client = Client()
+    if user:
+        client.force_login(user)
+    return client
+
+
+def run(size, repeat, warm=False):
+    """Замеряет все маршруты от имени самого активного читателя.
+
+    Маршруты из AUTHOR_ROUTES открываются от имени автора поста.
+    """
+    kwargs = sample_kwargs()
+    client = _client(reader())
+    author_client = client
+    if kwargs['post_id']:
+        author_client = _client(Post.objects.get(pk=kwargs['post_id']).author)
+    return [
+        {'size': size, 'route': name, 'url': url,
+         **measure(author_client if name in AUTHOR_ROUTES else client,
+                   url, repeat, warm)}
+        for name, url in routes(kwargs)
+    ]
+
+
+def compare(results, baseline, threshold):
+    """Ищет регрессии относительно прошлого прогона.
+
+    Регрессией считается рост числа запросов или p95 больше чем в
+    threshold раз.
+    """
+    previous = {
+        (row['size'], row['route']): row for row in baseline['results']}
+    regressions = []
+    for row in results:
+        old = previous.get((row['size'], row['route']))
+        if old is None:
+            continue
+        if row['queries'] > old['queries']:
+            regressions.append(
+                f'{row["route"]} @ {row["size"]}: запросов '
+                f'{old["queries"]} -> {row["queries"]}')
+        if row['p95_ms'] > old['p95_ms'] * threshold:
+            regressions.append(
+                f'{row["route"]} @ {row["size"]}: p95 '
+                f'{old["p95_ms"]} -> {row["p95_ms"]} мс')
+    return regressions
+
+
+def load(path):
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def dump(report, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
@@ -0,0 +1,177 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_vary_headers
+
+from core.db_router import read_from_replica, versioned_timeout
+
+FEED_VERSION_KEY = 'posts:feed_version'
+PAGE_KEY = 'posts:page:{}'
+TAG_KEY = 'posts:tag:{}'
+PAGE_STATS_KEY = 'posts:page_cache:{}'
+PURGE_CLOCK_KEY = 'posts:purge_clock'
+
+
+def _new_version():
+    return int(time.time() * 1000)
+
+
+def feed_version():
+    """Текущее поколение лент: входит в ключ каждого фрагмента ленты.
+
+    После вытеснения ключа отсчет начинается с текущего времени в мс,
+    чтобы не совпасть ни с одним из прежних поколений.
+    """
+    version = cache.get(FEED_VERSION_KEY)
+    if version is None:
+        cache.add(FEED_VERSION_KEY, _new_version(), None)
+        version = cache.get(FEED_VERSION_KEY)
+    return version
+
+
+def bump_feed_version():
+    """Делает недействительными все закешированные фрагменты лент."""
+    try:
+        cache.incr(FEED_VERSION_KEY)
+    except ValueError:
+        feed_version()
+
+
+def comments_stamp(posts):
+    """Счетчики комментариев постов страницы для ключа фрагмента ленты.
+
+    Комментарии не меняют поколение лент, поэтому фрагмент со списком
+    карточек учитывает их сам.
+    """
+    return ','.join(f'{post.pk}:{post.comment_count}' for post in posts)
+
+
+def tag_versions(tags):
+    """Возвращает текущие версии тегов, заводя недостающие."""
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def purge_clock():
+    """Счетчик сбросов тегов: по нему видно, был ли сброс за время
+    рендера страницы, еще до того, как известны ее теги."""
+    cache.add(PURGE_CLOCK_KEY, 0, None)
+    return cache.get(PURGE_CLOCK_KEY)
+
+
+def purge_tags(*tags):
+    """Сбрасывает все страницы, зависящие от любого из тегов."""
+    try:
+        cache.incr(PURGE_CLOCK_KEY)
+    except ValueError:
+        pass
+    for tag in tags:
+        try:
+            cache.incr(TAG_KEY.format(tag))
+        except ValueError:
+            pass
+
+
+def add_cache_tags(request, *tags, posts=()):
+    """Помечает ответ тегами объектов, из которых он собран.
+
+    Теги постов страницы вычисляются лениво, только при сохранении
+    ответа в кеш.
+    """
+    request.cache_tags = getattr(request, 'cache_tags', set()) | set(tags)
+    request.cache_tag_posts = getattr(request, 'cache_tag_posts', []) + [
+        posts]
+
+
+def post_tags(post):
+    return {
+        f'post:{post.pk}',
+        f'author:{post.author_id}',
+        f'group:{post.group_id}',
+    }
+
+
+def _request_tags(request):
+    tags = set(getattr(request, 'cache_tags', ()))
+    for posts in getattr(request, 'cache_tag_posts', ()):
+        for post in posts:
+            tags |= post_tags(post)
+    return tags
+
+
+def _count(outcome):
+    key = PAGE_STATS_KEY.format(outcome)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def page_cache_stats():
+    hits, misses = (
+        cache.get(PAGE_STATS_KEY.format(outcome), 0)
+        for outcome in ('hits', 'misses')
+    )
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'ratio': hits / total if total else 0.0,
+    }
+
+
+def cache_anonymous_page(view):
+    """Кеширует полные ответы анонимным посетителям на GET-запросы.
+
+    Вместе со страницей хранятся версии ее тегов; страница выдается из
+    кеша, только пока ни один тег не был сброшен через purge_tags.
+    Совпадение If-None-Match с ETag сохраненной страницы дает 304.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        key = PAGE_KEY.format(hashlib.md5(
+            request.get_full_path().encode()).hexdigest())
+        entry = cache.get(key)
+        if entry is not None:
+            response, versions = entry
+            if tag_versions(versions) == versions:
+                _count('hits')
+                response['X-Page-Cache'] = 'HIT'
+                return get_conditional_response(
+                    request,
+                    etag=response.get('ETag'),
+                    response=response,
+                ) or response
+        _count('misses')
+        clock = purge_clock()
+        response = view(request, *args, **kwargs)
+        if read_from_replica():
+            # ETag строится по текущим версиям, а тело могло прийти с
+            # отстающей реплики: сохраненный с ним ответ давал бы 304 на
+            # устаревшую страницу.
+            del response['ETag']
+        tags = _request_tags(request)
+        # Сброс во время рендера мог прийти после чтения данных: такую
+        # страницу нельзя сохранять под версиями тегов после сброса.
+        if (tags and response.status_code == 200 and not response.streaming
+                and cache.get(PURGE_CLOCK_KEY) == clock):
+            patch_vary_headers(response, ('Cookie',))
+            cache.set(
+                key,
+                (response, tag_versions(tags)),
+                versioned_timeout(settings.PAGE_CACHE_TIMEOUT))
+        response['X-Page-Cache'] = 'MISS'
+        return response
+    return wrapper
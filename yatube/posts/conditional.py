@@ -0,0 +1,64 @@
+import hashlib
+import json
+
+from core.cache import get_cached
+
+from .cache import tag_versions
+from .follows import is_following
+from .models import Group, Post, User, UserStats
+
+
+def _etag(request, state):
+    """ETag страницы: адрес, зритель и состояние данных страницы.
+
+    От зрителя зависят шапка, меню автора и форма комментария.
+    """
+    return hashlib.md5(json.dumps(
+        [request.get_full_path(), request.user.pk, state],
+        default=str,
+    ).encode()).hexdigest()
+
+
+def group_posts_etag(request, group_list):
+    try:
+        group = get_cached(Group, slug=group_list)
+    except Group.DoesNotExist:
+        return None
+    return _etag(request, [
+        group.pk,
+        group.title,
+        group.description,
+        # Тег группы сбрасывается при любом изменении ее постов и их
+        # карточек, включая комментарии и переименование автора.
+        tag_versions([f'group:{group.pk}']),
+    ])
+
+
+def profile_etag(request, username):
+    try:
+        author = get_cached(User, username=username)
+    except User.DoesNotExist:
+        return None
+    stats = UserStats.objects.filter(user_id=author.pk).values_list(
+        'posts_count', 'follows_count', 'followers_count').first()
+    following = is_following(request.user, author.pk)
+    return _etag(request, [
+        author.pk,
+        author.get_full_name(),
+        stats,
+        following,
+        tag_versions([f'author:{author.pk}']),
+    ])
+
+
+def post_detail_etag(request, post_id):
+    updated_at = Post.objects.filter(pk=post_id).values_list(
+        'updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    # Тег comments:<id> сбрасывается при любом изменении комментариев
+    # поста, поэтому агрегат по комментариям не нужен.
+    return _etag(request, [
+        updated_at,
+        tag_versions([f'comments:{post_id}']),
+    ])
@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Comment, Follow, Post, User, UserStats
+
+BATCH_SIZE = 1000
+
+STATS_SOURCES = {
+    'posts_count': (Post, 'author'),
+    'follows_count': (Follow, 'user'),
+    'followers_count': (Follow, 'author'),
+}
+
+
+def _count(model, field):
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')}).order_by().values(
+            field).annotate(total=Count('pk')).values('total')), 0)
+
+
+def bump_comments(post_id, delta):
+    """Сдвигает счетчик комментариев поста."""
+    posts = Post.objects.filter(pk=post_id)
+    if delta < 0:
+        posts = posts.filter(comment_count__gte=-delta)
+    posts.update(comment_count=F('comment_count') + delta)
+
+
+def reconcile_comments():
+    """Пересчитывает разошедшиеся счетчики комментариев постов."""
+    real = _count(Comment, 'post')
+    stale = Post.objects.annotate(real=real).exclude(
+        comment_count=F('real')).values('pk')
+    return Post.objects.filter(pk__in=stale).update(comment_count=real)
+
+
+def bump(user_id, field, delta):
+    """Сдвигает счетчик пользователя; недостающую запись пересчитывает."""
+    with transaction.atomic():
+        updated = UserStats.objects.filter(user_id=user_id).update(
+            **{field: F(field) + delta})
+        if not updated and delta > 0:
+            reconcile([user_id])
+
+
+def get_stats(user):
+    """Возвращает счетчики пользователя, создавая их при первом запросе."""
+    try:
+        return user.stats
+    except UserStats.DoesNotExist:
+        # В транзакции счетчики считаются по основной базе, а не по реплике.
+        with transaction.atomic():
+            reconcile([user.pk])
+            return UserStats.objects.get(user=user)
+
+
+def reconcile(user_ids=None):
+    """Сверяет счетчики с данными и возвращает число исправленных записей."""
+    users = User.objects.order_by('pk')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    rows = users.annotate(**{
+        field: _count(model, lookup)
+        for field, (model, lookup) in STATS_SOURCES.items()
+    }).values_list('pk', *STATS_SOURCES)
+    fixed = 0
+    batch = []
+    for row in rows.iterator():
+        batch.append(UserStats(user_id=row[0], **dict(zip(STATS_SOURCES,
+                                                          row[1:]))))
+        if len(batch) == BATCH_SIZE:
+            fixed += _save(batch)
+            batch = []
+    if batch:
+        fixed += _save(batch)
+    return fixed
+
+
+@transaction.atomic
+def _save(batch):
+    existing = UserStats.objects.select_for_update().in_bulk(
+        [stats.user_id for stats in batch])
+    changed = [
+        stats for stats in batch
+        if stats.user_id in existing and any(
+            getattr(stats, field) != getattr(existing[stats.user_id], field)
+            for field in STATS_SOURCES)
+    ]
+    missing = [stats for stats in batch if stats.user_id not in existing]
+    UserStats.objects.bulk_update(changed, list(STATS_SOURCES))
+    UserStats.objects.bulk_create(missing, ignore_conflicts=True)
+    return len(changed) + len(missing)
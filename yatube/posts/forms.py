@@ -1,5 +1,7 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
 
+from . import images
 from .models import Post, Comment, Group
 
 
@@ -15,6 +17,14 @@ class PostForm(forms.ModelForm):
                       'group': 'Из уже существующих',
                       'image': 'Фоточку например'}
 
+    def clean_image(self):
+        """Проверяет заголовок загруженной картинки и уменьшает оригинал."""
+        image = self.cleaned_data.get('image')
+        if not isinstance(image, UploadedFile):
+            return image
+        images.check_header(image)
+        return images.downscale(image)
+
 
 class CommentForm(forms.ModelForm):
 
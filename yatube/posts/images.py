@@ -0,0 +1,178 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from PIL import Image, ImageOps, features
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as thumbnail_defaults
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.THUMBNAIL_WORKERS,
+            thread_name_prefix='thumbnails',
+        )
+    return _executor
+
+
+SOURCE_FORMATS = {
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+    '.png': 'PNG',
+    '.gif': 'GIF',
+    '.webp': 'WEBP',
+}
+
+MIME_TYPES = {
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+}
+
+
+def derivative_formats(image):
+    """Форматы производных картинки: WebP (если доступен) и исходный."""
+    extension = os.path.splitext(image.name)[1].lower()
+    source = SOURCE_FORMATS.get(extension, 'JPEG')
+    formats = [source]
+    if source != 'WEBP' and features.check('webp'):
+        formats.insert(0, 'WEBP')
+    return formats
+
+
+def stored_thumbnail(image, geometry, **options):
+    """Миниатюра из kvstore sorl или None, если ее еще не создали.
+
+    В отличие от get_thumbnail никогда не читает и не уменьшает оригинал.
+    """
+    backend = default.backend
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(thumbnail_defaults, attr):
+            options.setdefault(key, value)
+    name = backend._get_thumbnail_filename(
+        ImageFile(image), geometry, options)
+    return default.kvstore.get(ImageFile(name, default.storage))
+
+
+def derivatives(image, image_format, thumbnail=get_thumbnail):
+    """Пары (ширина, миниатюра) для всех ширин POST_IMAGE_WIDTHS.
+
+    Миниатюры получаются по мере перебора. С thumbnail=stored_thumbnail
+    вместо еще не созданных возвращается None.
+    """
+    width, height = settings.POST_IMAGE_SIZE
+    for size in settings.POST_IMAGE_WIDTHS:
+        yield size, thumbnail(
+            image,
+            f'{size}x{round(size * height / width)}',
+            crop='center',
+            upscale=True,
+            format=image_format,
+        )
+
+
+def pregenerate(image):
+    """Создает все производные картинки во всех форматах."""
+    for image_format in derivative_formats(image):
+        list(derivatives(image, image_format))
+
+
+def _pregenerate_post(post_id):
+    try:
+        post = Post.objects.filter(pk=post_id).first()
+        if post is not None and post.image:
+            pregenerate(post.image)
+    except Exception:
+        logger.exception('Не удалось создать миниатюры поста %s', post_id)
+    finally:
+        if settings.THUMBNAIL_WORKERS:
+            connection.close()
+
+
+def schedule(post):
+    """После коммита отправляет генерацию миниатюр поста в фоновый пул.
+
+    При THUMBNAIL_WORKERS = 0 миниатюры создаются сразу после коммита
+    в текущем потоке.
+    """
+    if not post.image:
+        return
+    if settings.THUMBNAIL_WORKERS:
+        transaction.on_commit(
+            lambda: _get_executor().submit(_pregenerate_post, post.pk))
+    else:
+        transaction.on_commit(lambda: _pregenerate_post(post.pk))
+
+
+def check_header(upload):
+    """Проверяет формат и размеры картинки по заголовку, не декодируя ее."""
+    try:
+        with Image.open(upload) as image:
+            image_format, (width, height) = image.format, image.size
+    except Image.DecompressionBombError:
+        raise ValidationError(
+            'Слишком большое изображение.', code='image_pixels')
+    except (OSError, SyntaxError):
+        raise ValidationError(
+            'Загрузите правильное изображение.', code='invalid_image')
+    finally:
+        upload.seek(0)
+    if image_format not in settings.POST_IMAGE_FORMATS:
+        raise ValidationError(
+            'Формат %(format)s не поддерживается.',
+            code='image_format',
+            params={'format': image_format},
+        )
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            'Слишком большое изображение: %(width)sx%(height)s.',
+            code='image_pixels',
+            params={'width': width, 'height': height},
+        )
+    return image_format, (width, height)
+
+
+def downscale(upload):
+    """Уменьшает оригинал до POST_IMAGE_MAX_SIDE по большей стороне.
+
+    Анимированные картинки и картинки в пределах лимита не меняются.
+    Поворот из EXIF применяется к пикселям, так как метаданные
+    при пересохранении теряются.
+    """
+    max_side = settings.POST_IMAGE_MAX_SIDE
+    with Image.open(upload) as image:
+        if (max(image.size) <= max_side
+                or getattr(image, 'is_animated', False)):
+            upload.seek(0)
+            return upload
+        image_format = image.format
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side))
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        buffer = BytesIO()
+        image.save(buffer, format=image_format, quality=90)
+    return SimpleUploadedFile(
+        upload.name,
+        buffer.getvalue(),
+        content_type=Image.MIME.get(image_format),
+    )
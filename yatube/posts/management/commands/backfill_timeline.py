@@ -0,0 +1,29 @@
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+from posts.models import Follow, Timeline
+
+
+class Command(BaseCommand):
+    help = 'Заполняет ленты подписок по уже существующим подпискам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Предварительно очистить все ленты.',
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            Timeline.objects.all().delete()
+        follows = Follow.objects.order_by('user_id').values_list(
+            'user_id', 'author_id')
+        created = 0
+        for user_id, pairs in groupby(follows.iterator(), lambda x: x[0]):
+            created += timeline.fan_in(
+                user_id, [author_id for _, author_id in pairs])
+        self.stdout.write(self.style.SUCCESS(
+            f'Записей в лентах добавлено: {created}'))
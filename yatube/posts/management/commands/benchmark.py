@@ -0,0 +1,103 @@
+from io import StringIO
+
+import django
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    setup_test_environment, teardown_test_environment)
+from django.utils import timezone
+
+from posts import benchmark
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Замеряет число SQL-запросов, время SQL и латентность страниц '
+            'posts/urls.py на тестовой базе разного размера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=int, nargs='+', default=[1000, 10000],
+            help='Число постов в базе для каждого замера.')
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Сколько раз запрашивать каждую страницу.')
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Не сбрасывать кеш между запросами.')
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора данных.')
+        parser.add_argument(
+            '--output', default=None,
+            help='Файл для результатов в JSON.')
+        parser.add_argument(
+            '--compare', default=None,
+            help='JSON прошлого прогона для поиска регрессий.')
+        parser.add_argument(
+            '--threshold', type=float, default=1.2,
+            help='Во сколько раз может вырасти p95 без регрессии.')
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу после замера.')
+
+    def grow(self, size, seed):
+        """Досоздает данные, чтобы постов стало size."""
+        posts = size - Post.objects.count()
+        if posts <= 0:
+            return
+        users = max(posts // 20, 10)
+        call_command(
+            'seed_data', users=users, groups=max(posts // 400, 2),
+            posts=posts, comments=posts * 2, follows=users * 10,
+            seed=seed + size, stdout=StringIO())
+
+    def handle(self, *args, **options):
+        report = {
+            'meta': {
+                'started': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'django': django.get_version(),
+                'repeat': options['repeat'],
+                'warm': options['warm'],
+            },
+            'results': [],
+        }
+        setup_test_environment()
+        caches = benchmark.isolated_cache()
+        caches.enable()
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+            keepdb=options['keepdb'])
+        try:
+            for size in sorted(options['sizes']):
+                self.grow(size, options['seed'])
+                for row in benchmark.run(
+                        size, options['repeat'], options['warm']):
+                    report['results'].append(row)
+                    self.stdout.write(
+                        f'{size:>8} {row["route"]:<16} {row["status"]} '
+                        f'запросов {row["queries"]:>3}  '
+                        f'SQL {row["sql_ms"]:>8} мс  '
+                        f'p50 {row["p50_ms"]:>8} мс  '
+                        f'p95 {row["p95_ms"]:>8} мс')
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb'])
+            caches.disable()
+            teardown_test_environment()
+        output = options['output'] or (
+            f'benchmark-{timezone.now():%Y%m%d-%H%M%S}.json')
+        benchmark.dump(report, output)
+        self.stdout.write(self.style.SUCCESS(
+            f'Результаты записаны в {output}'))
+        if options['compare']:
+            regressions = benchmark.compare(
+                report['results'], benchmark.load(options['compare']),
+                options['threshold'])
+            if regressions:
+                raise CommandError(
+                    'Регрессии производительности:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from posts import suggestions
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает предложения подписок по подпискам подписок '
+            'читателей.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=None,
+            help='Сколько предложений хранить на читателя '
+                 '(по умолчанию SUGGESTIONS_LIMIT).')
+
+    def handle(self, *args, **options):
+        saved = suggestions.compute(options['limit'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Сохранено предложений подписок: {saved}'))
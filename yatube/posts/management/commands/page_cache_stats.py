@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import page_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Показывает долю попаданий в кеш страниц для анонимов.'
+
+    def handle(self, *args, **options):
+        stats = page_cache_stats()
+        self.stdout.write(
+            f'Попаданий: {stats["hits"]}, промахов: {stats["misses"]}, '
+            f'доля попаданий: {stats["ratio"]:.1%}')
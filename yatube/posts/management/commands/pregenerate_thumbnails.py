@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.images import pregenerate
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создает миниатюры для всех картинок уже опубликованных постов.'
+
+    def handle(self, *args, **options):
+        done = 0
+        for post in Post.objects.exclude(image='').only('image').iterator():
+            pregenerate(post.image)
+            done += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано картинок: {done}'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+from posts.models import Group, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересоздает полнотекстовый индекс постов и групп.'
+
+    def handle(self, *args, **options):
+        for model in (Post, Group):
+            search.rebuild(model)
+        self.stdout.write(self.style.SUCCESS('Поисковый индекс пересоздан'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счетчики по реальным данным.'
+
+    def handle(self, *args, **options):
+        fixed = counters.reconcile()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счетчиков пользователей: {fixed}'))
+        fixed = counters.reconcile_comments()
+        self.stdout.write(self.style.SUCCESS(
+            f'Исправлено счетчиков комментариев: {fixed}'))
@@ -0,0 +1,53 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from posts.cache import bump_feed_version
+from posts.seed import Seeder
+
+
+class Command(BaseCommand):
+    help = ('Создает синтетических пользователей, группы, посты, '
+            'комментарии и подписки для нагрузочного тестирования.')
+
+    def add_arguments(self, parser):
+        for name, default in (('users', 1000), ('groups', 50),
+                              ('posts', 20000), ('comments', 50000),
+                              ('follows', 20000)):
+            parser.add_argument(
+                f'--{name}', type=int, default=default,
+                help=f'Сколько создать (по умолчанию {default}).')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Размер пачки bulk_create.')
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней разбросать даты постов.')
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора для воспроизводимых данных.')
+        parser.add_argument(
+            '--password', default='password',
+            help='Пароль всех созданных пользователей.')
+
+    def progress(self, model, created):
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {created}')
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            seed=options['seed'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            password=options['password'],
+            progress=self.progress if options['verbosity'] > 1 else None,
+        )
+        created = seeder.run(**{
+            name: options[name]
+            for name in ('users', 'groups', 'posts', 'comments', 'follows')
+        })
+        # bulk_create не вызывает сигналы: пересчитываем производные данные.
+        for command in ('backfill_timeline', 'reconcile_counters',
+                        'rebuild_search_index', 'compute_suggestions'):
+            call_command(command, stdout=self.stdout)
+        bump_feed_version()
+        self.stdout.write(self.style.SUCCESS('Создано: ' + ', '.join(
+            f'{name} {count}' for name, count in created.items())))
@@ -0,0 +1,28 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0003_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='пользователь')),
+                ('posts_count', models.IntegerField(default=0, verbose_name='постов')),
+                ('follows_count', models.IntegerField(default=0, verbose_name='подписок')),
+                ('followers_count', models.IntegerField(default=0, verbose_name='подписчиков')),
+            ],
+            options={
+                'verbose_name_plural': 'счетчики пользователей',
+            },
+        ),
+    ]
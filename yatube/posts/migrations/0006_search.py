@@ -0,0 +1,60 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:40
+
+from django.conf import settings
+from django.db import migrations
+
+# SQL зафиксирован здесь, чтобы миграция не зависела от posts.search.
+SEARCH_TABLES = (
+    ('posts_post', ('text',)),
+    ('posts_group', ('title', 'description')),
+)
+
+
+def _document(fields):
+    return ' || '.join(
+        f"setweight(to_tsvector(%s::regconfig, coalesce({field}, '')),"
+        f" '{weight}')"
+        for field, weight in zip(fields, 'ABCD')
+    )
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for source, fields in SEARCH_TABLES:
+        table, columns = f'{source}_search', ', '.join(fields)
+        if vendor == 'postgresql':
+            schema_editor.execute(
+                f'CREATE TABLE {table} ('
+                f'object_id integer PRIMARY KEY REFERENCES {source} (id) '
+                f'ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, '
+                f'document tsvector NOT NULL)')
+            schema_editor.execute(
+                f'CREATE INDEX {table}_gin ON {table} USING GIN (document)')
+            schema_editor.execute(
+                f'INSERT INTO {table} (object_id, document) '
+                f'SELECT id, {_document(fields)} FROM {source}',
+                [settings.SEARCH_CONFIG] * len(fields))
+        elif vendor == 'sqlite':
+            schema_editor.execute(
+                f'CREATE VIRTUAL TABLE {table} USING fts5('
+                f'{columns}, tokenize="unicode61")')
+            schema_editor.execute(
+                f'INSERT INTO {table} (rowid, {columns}) '
+                f'SELECT id, {columns} FROM {source}')
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in ('postgresql', 'sqlite'):
+        for source, _ in SEARCH_TABLES:
+            schema_editor.execute(f'DROP TABLE IF EXISTS {source}_search')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0005_post_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:49
+
+from django.db import migrations, models
+import posts.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0008_follow_suggestion'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='comment',
+            name='post',
+            field=models.ForeignKey(on_delete=posts.models.cascade_post_comments, related_name='comments', to='posts.Post', verbose_name='пост'),
+        ),
+    ]
@@ -17,10 +17,30 @@ class Post(CreatedModel):
         upload_to='posts/',
         blank=True
     )
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True
+    )
+    comment_count = models.PositiveIntegerField(
+        'Число комментариев',
+        default=0,
+        editable=False
+    )
 
     class Meta(CreatedModel.Meta):
         verbose_name_plural = 'посты'
         default_related_name = 'posts'
+        indexes = [
+            models.Index(
+                name='post_pub_date_id_idx',
+                fields=['-pub_date', '-id'],),
+            models.Index(
+                name='post_author_pub_date_idx',
+                fields=['author', '-pub_date', '-id'],),
+            models.Index(
+                name='post_group_pub_date_idx',
+                fields=['group', '-pub_date', '-id'],),
+        ]
 
 
 class Group(models.Model):
@@ -53,16 +73,31 @@ class Group(models.Model):
         return self.title
 
 
+def cascade_post_comments(collector, field, sub_objs, using):
+    """CASCADE, помечающий комментарии, которые удаляются вместе с постом.
+
+    Для помеченных комментариев не пересчитывается счетчик поста.
+    """
+    models.CASCADE(collector, field, sub_objs, using)
+    for comment in sub_objs:
+        comment._post_deleted = True
+
+
 class Comment(CreatedModel):
     post = models.ForeignKey(
         Post,
-        on_delete=models.CASCADE,
+        on_delete=cascade_post_comments,
         verbose_name='пост'
     )
 
     class Meta(CreatedModel.Meta):
         verbose_name_plural = 'коментарии'
         default_related_name = 'comments'
+        indexes = [
+            models.Index(
+                name='comment_post_pub_date_idx',
+                fields=['post', 'pub_date'],),
+        ]
 
 
 class Follow(models.Model):
@@ -89,7 +124,103 @@ class Follow(models.Model):
                 name='prevent_self_follow',
                 check=~models.Q(user=models.F("author")),),
         ]
+        indexes = [
+            models.Index(
+                name='follow_author_user_idx',
+                fields=['author', 'user'],),
+        ]
 
     def __str__(self):
         return (f'Пользователь {self.user.username}'
                 f'подписан на {self.author.username}')
+
+
+class Timeline(models.Model):
+    """Материализованная лента подписок: запись на пару читатель-пост."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='читатель',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='пост',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='автор поста',
+    )
+    pub_date = models.DateTimeField('Дата создания поста')
+
+    class Meta:
+        verbose_name_plural = 'ленты подписок'
+        ordering = ('-pub_date',)
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_timeline_post',
+                fields=['user', 'post'],),
+        ]
+        indexes = [
+            models.Index(
+                name='timeline_user_pub_date_idx',
+                fields=['user', '-pub_date', '-id'],),
+        ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счетчики пользователя для страницы профиля."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='пользователь',
+    )
+    posts_count = models.IntegerField('постов', default=0)
+    follows_count = models.IntegerField('подписок', default=0)
+    followers_count = models.IntegerField('подписчиков', default=0)
+
+    class Meta:
+        verbose_name_plural = 'счетчики пользователей'
+
+    def __str__(self):
+        return f'Счетчики {self.user_id}'
+
+
+class FollowSuggestion(models.Model):
+    """Предложение подписки, посчитанное по подпискам подписок читателя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        verbose_name='читатель',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='предлагаемый автор',
+    )
+    score = models.PositiveIntegerField('общих подписок')
+
+    class Meta:
+        verbose_name_plural = 'предложения подписок'
+        ordering = ('-score', 'author_id')
+        constraints = [
+            models.UniqueConstraint(
+                name='unique_follow_suggestion',
+                fields=['user', 'author'],),
+        ]
+        indexes = [
+            models.Index(
+                name='suggestion_user_score_idx',
+                fields=['user', '-score'],),
+        ]
+
+    def __str__(self):
+        return f'Предложение {self.author_id} для {self.user_id}'
@@ -0,0 +1,114 @@
+import re
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Group, Post
+
+# Поля индексируемых моделей; порядок задает веса A, B, ... в PostgreSQL.
+SEARCH_FIELDS = {
+    Post._meta.label: ('text',),
+    Group._meta.label: ('title', 'description'),
+}
+
+WEIGHTS = 'ABCD'
+
+
+def _table(model):
+    return f'{model._meta.db_table}_search'
+
+
+def _document(expressions):
+    return ' || '.join(
+        f"setweight(to_tsvector(%s::regconfig, coalesce({expression}, '')),"
+        f" '{weight}')"
+        for expression, weight in zip(expressions, WEIGHTS)
+    )
+
+
+def _populate(cursor, model):
+    table, fields = _table(model), SEARCH_FIELDS[model._meta.label]
+    source = model._meta.db_table
+    if cursor.db.vendor == 'postgresql':
+        cursor.execute(
+            f'INSERT INTO {table} (object_id, document) '
+            f'SELECT id, {_document(fields)} FROM {source}',
+            [settings.SEARCH_CONFIG] * len(fields))
+    elif cursor.db.vendor == 'sqlite':
+        cursor.execute(
+            f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+            f'SELECT id, {", ".join(fields)} FROM {source}')
+
+
+def index(instance):
+    """Добавляет или обновляет запись объекта в полнотекстовом индексе."""
+    model = type(instance)
+    table, fields = _table(model), SEARCH_FIELDS[model._meta.label]
+    values = [getattr(instance, field) for field in fields]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            params = []
+            for value in values:
+                params += [settings.SEARCH_CONFIG, value]
+            cursor.execute(
+                f'INSERT INTO {table} (object_id, document) '
+                f'VALUES (%s, {_document(["%s::text"] * len(fields))}) '
+                f'ON CONFLICT (object_id) '
+                f'DO UPDATE SET document = EXCLUDED.document',
+                [instance.pk, *params])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+            cursor.execute(
+                f'INSERT INTO {table} (rowid, {", ".join(fields)}) '
+                f'VALUES (%s{", %s" * len(fields)})',
+                [instance.pk, *values])
+
+
+def unindex(instance):
+    """Удаляет объект из полнотекстового индекса."""
+    table = _table(type(instance))
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'DELETE FROM {table} WHERE object_id = %s', [instance.pk])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'DELETE FROM {table} WHERE rowid = %s', [instance.pk])
+
+
+def rebuild(model):
+    """Переиндексирует все объекты модели, например после bulk_create."""
+    if connection.vendor not in ('postgresql', 'sqlite'):
+        return
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {_table(model)}')
+        _populate(cursor, model)
+
+
+def search_ids(model, query, limit=None):
+    """Возвращает id объектов, подходящих под запрос, по убыванию ранга."""
+    limit = limit or settings.SEARCH_LIMIT
+    words = re.findall(r'\w+', query)
+    if not words:
+        return []
+    table = _table(model)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'SELECT object_id FROM {table}, '
+                f'plainto_tsquery(%s::regconfig, %s) query '
+                f'WHERE document @@ query '
+                f'ORDER BY ts_rank(document, query) DESC LIMIT %s',
+                [settings.SEARCH_CONFIG, ' '.join(words), limit])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY rank LIMIT %s',
+                [' '.join(f'"{word}"' for word in words), limit])
+        else:
+            field = SEARCH_FIELDS[model._meta.label][0]
+            return list(model.objects.filter(**{
+                f'{field}__icontains': query}).values_list(
+                    'pk', flat=True)[:limit])
+        return [row[0] for row in cursor.fetchall()]
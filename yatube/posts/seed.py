@@ -0,0 +1,204 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+
+from .models import Comment, Follow, Group, Post, User
+
+# Параметр распределения Парето: около 20% авторов собирают 80% подписок.
+PARETO_ALPHA = 1.16
+
+# Размер пула заранее сгенерированных фраз: Faker медленный, а тексту
+# нагрузочных данных достаточно перемешивать готовые предложения.
+TEXT_POOL_SIZE = 2000
+
+# Доля постов без группы.
+NO_GROUP_SHARE = 0.3
+
+
+def _weights(rnd, count):
+    """Накопленные веса популярности с длинным хвостом."""
+    return list(accumulate(
+        rnd.paretovariate(PARETO_ALPHA) for _ in range(count)))
+
+
+@contextmanager
+def _manual_dates():
+    """Отключает auto_now(_add), чтобы даты можно было разбросать."""
+    fields = [
+        Post._meta.get_field('pub_date'),
+        Post._meta.get_field('updated_at'),
+        Comment._meta.get_field('pub_date'),
+    ]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _last_pk(model):
+    return model.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def _bulk(model, objects, batch_size, progress=None):
+    """Сохраняет объекты пачками через bulk_create."""
+    objects = iter(objects)
+    created = 0
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return created
+        with transaction.atomic():
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+        if progress:
+            progress(model, created)
+
+
+class Seeder:
+    """Генератор синтетических данных для нагрузочного тестирования.
+
+    Объекты создаются через bulk_create, поэтому сигналы не срабатывают:
+    ленты, счетчики и поисковый индекс после генерации нужно пересчитать.
+    """
+
+    def __init__(self, seed=None, days=365, batch_size=5000,
+                 password='password', progress=None):
+        self.random = random.Random(seed)
+        self.fake = Faker('ru_RU')
+        self.fake.seed_instance(seed)
+        self.days = days
+        self.batch_size = batch_size
+        self.password = make_password(password)
+        self.progress = progress
+        self.prefix = f'seed{self.random.randrange(16 ** 6):06x}'
+        self.now = timezone.now()
+        self.sentences = [
+            self.fake.sentence() for _ in range(TEXT_POOL_SIZE)]
+
+    def _text(self, sentences):
+        return ' '.join(self.random.choices(
+            self.sentences, k=self.random.randint(1, sentences)))
+
+    def _date(self, since=None):
+        since = since or self.now - timedelta(days=self.days)
+        span = (self.now - since).total_seconds()
+        return since + timedelta(seconds=self.random.uniform(0, span))
+
+    def _bulk(self, model, objects):
+        last_pk = _last_pk(model)
+        _bulk(model, objects, self.batch_size, self.progress)
+        return list(model.objects.filter(pk__gt=last_pk).order_by(
+            'pk').values_list('pk', flat=True))
+
+    def users(self, count):
+        return self._bulk(User, (
+            User(
+                username=f'{self.prefix}_{number}',
+                first_name=self.fake.first_name(),
+                last_name=self.fake.last_name(),
+                password=self.password,
+            )
+            for number in range(count)
+        ))
+
+    def groups(self, count, user_ids):
+        return self._bulk(Group, (
+            Group(
+                title=f'{self.fake.word().capitalize()} {number}',
+                slug=f'{self.prefix}-{number}',
+                description=self._text(3),
+                author_id=self.random.choice(user_ids),
+            )
+            for number in range(count)
+        ))
+
+    def posts(self, count, user_ids, group_ids):
+        authors = _weights(self.random, len(user_ids))
+        groups = _weights(self.random, len(group_ids))
+
+        def build():
+            for _ in range(count):
+                group_id = None
+                if group_ids and self.random.random() >= NO_GROUP_SHARE:
+                    group_id = self.random.choices(
+                        group_ids, cum_weights=groups)[0]
+                pub_date = self._date()
+                yield Post(
+                    author_id=self.random.choices(
+                        user_ids, cum_weights=authors)[0],
+                    group_id=group_id,
+                    text=self._text(5),
+                    pub_date=pub_date,
+                    updated_at=pub_date,
+                )
+
+        with _manual_dates():
+            return self._bulk(Post, build())
+
+    def comments(self, count, user_ids, post_ids):
+        dates = dict(Post.objects.filter(pk__gte=post_ids[0]).values_list(
+            'pk', 'pub_date'))
+        posts = _weights(self.random, len(post_ids))
+
+        def build():
+            for _ in range(count):
+                post_id = self.random.choices(post_ids, cum_weights=posts)[0]
+                yield Comment(
+                    post_id=post_id,
+                    author_id=self.random.choice(user_ids),
+                    text=self._text(2),
+                    pub_date=self._date(since=dates[post_id]),
+                )
+
+        with _manual_dates():
+            return self._bulk(Comment, build())
+
+    def follows(self, count, user_ids):
+        """Подписки с перекосом: несколько авторов получают большую часть.
+
+        Повторы и подписки на себя отбрасываются, поэтому при сильном
+        перекосе пар может получиться меньше запрошенного.
+        """
+        count = min(count, len(user_ids) * (len(user_ids) - 1))
+        authors = _weights(self.random, len(user_ids))
+        pairs = set()
+        attempts = 0
+        while len(pairs) < count and attempts < count * 3:
+            attempts += 1
+            user_id = self.random.choice(user_ids)
+            author_id = self.random.choices(
+                user_ids, cum_weights=authors)[0]
+            if user_id != author_id:
+                pairs.add((user_id, author_id))
+        return self._bulk(Follow, (
+            Follow(user_id=user_id, author_id=author_id)
+            for user_id, author_id in pairs
+        ))
+
+    def run(self, users, groups, posts, comments, follows):
+        """Создает данные и возвращает число созданных объектов по типам."""
+        user_ids = self.users(users)
+        group_ids = self.groups(groups, user_ids) if user_ids else []
+        post_ids = (
+            self.posts(posts, user_ids, group_ids) if user_ids else [])
+        comment_ids = (
+            self.comments(comments, user_ids, post_ids) if post_ids else [])
+        follow_ids = self.follows(follows, user_ids) if user_ids else []
+        return {
+            'users': len(user_ids),
+            'groups': len(group_ids),
+            'posts': len(post_ids),
+            'comments': len(comment_ids),
+            'follows': len(follow_ids),
+        }
@@ -0,0 +1,161 @@
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core import cache as object_cache
+from . import counters, follows, search, timeline
+from .cache import bump_feed_version, post_tags, purge_tags
+from .models import Comment, Follow, FollowSuggestion, Group, Post, User
+
+# Поля, по которым объекты читаются через core.cache.get_cached; первое
+# может меняться, поэтому его старое значение запоминается до сохранения.
+CACHED_LOOKUPS = {Group: ('slug',), User: ('username', 'pk')}
+
+# Поля автора, которые выводятся на карточках постов.
+AUTHOR_FIELDS = ('username', 'first_name', 'last_name')
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, **kwargs):
+    bump_feed_version()
+    purge_tags('index', *post_tags(instance))
+    search.index(instance)
+    if created:
+        timeline.fan_out(instance)
+        counters.bump(instance.author_id, 'posts_count', 1)
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    bump_feed_version()
+    purge_tags('index', *post_tags(instance))
+    search.unindex(instance)
+    counters.bump(instance.author_id, 'posts_count', -1)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    posts = Post.objects.filter(group=instance)
+    author_ids = set(posts.values_list('author_id', flat=True).distinct())
+    posts.update(updated_at=timezone.now())
+    bump_feed_version()
+    purge_tags(f'group:{instance.pk}', *(
+        f'author:{author_id}' for author_id in author_ids))
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, **kwargs):
+    search.index(instance)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    search.unindex(instance)
+
+
+@receiver(pre_save, sender=User)
+def remember_author_fields(sender, instance, update_fields=None, **kwargs):
+    instance._author_fields = None
+    if instance.pk is None or (
+            update_fields is not None
+            and not set(AUTHOR_FIELDS) & set(update_fields)):
+        return
+    instance._author_fields = sender.objects.filter(
+        pk=instance.pk).values_list(*AUTHOR_FIELDS).first()
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, **kwargs):
+    old = getattr(instance, '_author_fields', None)
+    if old is None or old == tuple(
+            getattr(instance, field) for field in AUTHOR_FIELDS):
+        return
+    # Имя автора входит в закешированные карточки его постов.
+    posts = Post.objects.filter(author=instance)
+    group_ids = set(posts.values_list('group_id', flat=True).distinct())
+    posts.update(updated_at=timezone.now())
+    bump_feed_version()
+    purge_tags(f'author:{instance.pk}', *(
+        f'group:{group_id}' for group_id in group_ids if group_id))
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, **kwargs):
+    if created:
+        counters.bump_comments(instance.post_id, 1)
+        _comment_count_changed(instance.post_id)
+    else:
+        purge_tags(f'comments:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    # Комментарии удаляемого поста: пересчитывать счетчик и сбрасывать
+    # кеш на каждый из них незачем.
+    if getattr(instance, '_post_deleted', False):
+        return
+    counters.bump_comments(instance.post_id, -1)
+    _comment_count_changed(instance.post_id)
+
+
+def _comment_count_changed(post_id):
+    # Число комментариев выводится на карточке поста во всех лентах: ключи
+    # фрагментов карточек его учитывают, страницы сбрасываются по тегам
+    # поста, а общий тег comments меняет ETag лент API.
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'group_id').first()
+    purge_tags('comments', f'comments:{post_id}',
+               *(post_tags(post) if post else ()))
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_in(instance.user_id, [instance.author_id])
+        follows.invalidate_followed(instance.user_id)
+        FollowSuggestion.objects.filter(
+            user_id=instance.user_id, author_id=instance.author_id).delete()
+        purge_tags(f'author:{instance.user_id}',
+                   f'author:{instance.author_id}')
+        counters.bump(instance.user_id, 'follows_count', 1)
+        counters.bump(instance.author_id, 'followers_count', 1)
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    if follows.bulk_unfollowing(instance.user_id, instance.author_id):
+        return
+    timeline.drop(instance.user_id, instance.author_id)
+    follows.invalidate_followed(instance.user_id)
+    purge_tags(f'author:{instance.user_id}', f'author:{instance.author_id}')
+    counters.bump(instance.user_id, 'follows_count', -1)
+    counters.bump(instance.author_id, 'followers_count', -1)
+
+
+@receiver(pre_save, sender=Group)
+@receiver(pre_save, sender=User)
+def remember_cached_lookup(sender, instance, update_fields=None, **kwargs):
+    field = CACHED_LOOKUPS[sender][0]
+    if instance.pk is None or (
+            update_fields is not None and field not in update_fields):
+        return
+    instance._cached_lookup = sender.objects.filter(
+        pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=Group)
+@receiver(post_delete, sender=User)
+def invalidate_cached_lookup(sender, instance, **kwargs):
+    field, *other_fields = CACHED_LOOKUPS[sender]
+    values = {getattr(instance, field)}
+    old = getattr(instance, '_cached_lookup', None)
+    if old is not None:
+        values.add(old)
+    object_cache.invalidate(sender, field, *values)
+    for other_field in other_fields:
+        object_cache.invalidate(
+            sender, other_field, getattr(instance, other_field))
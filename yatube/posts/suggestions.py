@@ -0,0 +1,64 @@
+from itertools import groupby, islice
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef
+
+from .models import Follow, FollowSuggestion
+
+BATCH_SIZE = 1000
+
+
+def candidates():
+    """Авторы, на которых подписаны подписки читателя, с числом таких
+    общих подписок; себя и уже отслеживаемых авторов исключает.
+
+    Строки упорядочены по читателю и убыванию числа общих подписок.
+    """
+    return Follow.objects.annotate(
+        candidate=F('author__follower__author'),
+        followed=Exists(Follow.objects.filter(
+            user=OuterRef('user'),
+            author=OuterRef('author__follower__author'))),
+    ).filter(
+        candidate__isnull=False,
+        followed=False,
+    ).exclude(
+        candidate=F('user'),
+    ).values('user', 'candidate').annotate(
+        score=Count('pk'),
+    ).order_by('user', '-score', 'candidate').values_list(
+        'user', 'candidate', 'score')
+
+
+def _top(rows, limit):
+    for user_id, group in groupby(rows, key=lambda row: row[0]):
+        for _, author_id, score in islice(group, limit):
+            yield FollowSuggestion(
+                user_id=user_id, author_id=author_id, score=score)
+
+
+def compute(limit=None):
+    """Пересчитывает предложения подписок всех читателей.
+
+    Для каждого читателя хранится не больше limit лучших кандидатов, так
+    что виджет предложений читает их одним запросом. Возвращает число
+    сохраненных предложений.
+    """
+    suggestions = _top(
+        candidates().iterator(), limit or settings.SUGGESTIONS_LIMIT)
+    saved = 0
+    with transaction.atomic():
+        FollowSuggestion.objects.all().delete()
+        while True:
+            batch = list(islice(suggestions, BATCH_SIZE))
+            if not batch:
+                return saved
+            FollowSuggestion.objects.bulk_create(batch)
+            saved += len(batch)
+
+
+def for_user(user):
+    """Предложения подписок читателя: один запрос к базе."""
+    return list(user.follow_suggestions.select_related('author')[
+        :settings.SUGGESTIONS_LIMIT])
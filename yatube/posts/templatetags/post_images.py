@@ -0,0 +1,65 @@
+import logging
+
+from django import template
+from django.conf import settings
+
+from ..images import (MIME_TYPES, derivative_formats, derivatives,
+                      stored_thumbnail)
+
+logger = logging.getLogger(__name__)
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(image):
+    """Выводит <picture> с srcset по уже созданным производным картинки.
+
+    Шаблон никогда не уменьшает картинки: пока производных нет,
+    выводится оригинал.
+    """
+    if not image:
+        return {}
+    try:
+        *formats, fallback_format = derivative_formats(image)
+        fallback = _stored(image, fallback_format)
+        sources = [
+            (image_format, _stored(image, image_format))
+            for image_format in formats
+        ] if fallback else []
+    except Exception:
+        logger.exception('Не удалось получить производные %s', image.name)
+        return {'original': image.url}
+    if not fallback:
+        return {'original': image.url}
+    return {
+        'sources': [
+            {
+                'type': MIME_TYPES[source_format],
+                'srcset': _srcset(thumbnails),
+            }
+            for source_format, thumbnails in sources
+            if thumbnails
+        ],
+        'srcset': _srcset(fallback),
+        'src': fallback[-1][1],
+        'sizes': settings.POST_IMAGE_SIZES,
+    }
+
+
+def _stored(image, image_format):
+    """Все производные формата или пустой список, если хоть одной нет.
+
+    Перебор останавливается на первой отсутствующей, так что картинка
+    без производных стоит одного обращения к kvstore.
+    """
+    thumbnails = []
+    for width, thumb in derivatives(image, image_format, stored_thumbnail):
+        if thumb is None:
+            return []
+        thumbnails.append((width, thumb))
+    return thumbnails
+
+
+def _srcset(thumbnails):
+    return ', '.join(f'{thumb.url} {width}w' for width, thumb in thumbnails)
@@ -0,0 +1,58 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import benchmark
+from ..cache import PURGE_CLOCK_KEY
+from ..models import Comment, Follow, Group, Post, User
+
+
+class BenchmarkTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='testauthor')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.author,
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        Comment.objects.create(
+            post=cls.post, author=cls.reader, text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def test_run_measures_safe_routes(self):
+        """Замеряются все безопасные маршруты posts/urls.py"""
+        results = benchmark.run(size=1, repeat=2)
+        routes = {row['route'] for row in results}
+        self.assertIn('index', routes)
+        self.assertIn('post_edit', routes)
+        self.assertFalse(routes & benchmark.UNSAFE_ROUTES)
+        for row in results:
+            with self.subTest(route=row['route']):
+                self.assertEqual(row['status'], 200)
+                self.assertGreater(row['queries'], 0)
+                self.assertGreaterEqual(row['p95_ms'], row['p50_ms'])
+
+    def test_measure_keeps_configured_cache(self):
+        """Замер не сбрасывает и не заполняет настроенный кеш"""
+        cache.clear()
+        cache.set('benchmark:canary', 1)
+        benchmark.measure(Client(), reverse('posts:index'), repeat=2)
+        self.assertEqual(cache.get('benchmark:canary'), 1)
+        self.assertIsNone(cache.get(PURGE_CLOCK_KEY))
+
+    def test_compare_reports_regressions(self):
+        """Рост числа запросов и p95 считается регрессией"""
+        row = {'size': 1, 'route': 'index', 'queries': 4, 'p95_ms': 10.0}
+        baseline = {'results': [row]}
+        self.assertEqual(benchmark.compare([row], baseline, 1.2), [])
+        slower = dict(row, queries=5, p95_ms=13.0)
+        self.assertEqual(len(benchmark.compare([slower], baseline, 1.2)), 2)
@@ -0,0 +1,181 @@
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+
+from ..cache import (
+    add_cache_tags, cache_anonymous_page, page_cache_stats, purge_tags)
+from ..models import Comment, Follow, Group, Post, User
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.user,
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        cache.clear()
+        self.urls = (
+            reverse('posts:index'),
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        )
+
+    def assertCache(self, url, outcome):
+        response = self.guest_client.get(url)
+        self.assertEqual(response['X-Page-Cache'], outcome)
+        return response
+
+    def test_anonymous_pages_cached(self):
+        """Анонимные GET-запросы отдаются из кеша"""
+        for url in self.urls:
+            with self.subTest(url=url):
+                self.assertCache(url, 'MISS')
+                with self.assertNumQueries(0):
+                    self.assertCache(url, 'HIT')
+        self.assertEqual(page_cache_stats()['hits'], len(self.urls))
+        self.assertEqual(page_cache_stats()['ratio'], 0.5)
+
+    def test_authorized_not_cached(self):
+        """Авторизованным страницы из кеша не отдаются"""
+        client = Client()
+        client.force_login(self.reader)
+        client.get(self.urls[0])
+        response = client.get(self.urls[0])
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_purge_by_tags(self):
+        """Изменения объектов сбрасывают только зависящие страницы"""
+        index, group, profile, detail = self.urls
+        changes = (
+            (lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Коммент'),
+             (detail, index, group, profile), ()),
+            (lambda: Comment.objects.filter(post=self.post).first().save(),
+             (detail,), (index, group, profile)),
+            (lambda: Follow.objects.create(
+                user=self.reader, author=self.user),
+             (profile, detail, index, group), ()),
+            (lambda: Post.objects.create(author=self.reader, text='Новый'),
+             (index,), (group, profile, detail)),
+            (lambda: Group.objects.filter(pk=self.group.pk).first().save(),
+             (index, group, profile, detail), ()),
+        )
+        for change, purged, kept in changes:
+            with self.subTest(purged=purged):
+                for url in self.urls:
+                    self.guest_client.get(url)
+                change()
+                for url in purged:
+                    self.assertCache(url, 'MISS')
+                for url in kept:
+                    self.assertCache(url, 'HIT')
+
+    def test_purge_during_render_not_stored(self):
+        """Страница, во время рендера которой прошел сброс, не кешируется"""
+        renders = []
+
+        @cache_anonymous_page
+        def view(request):
+            renders.append(request)
+            add_cache_tags(request, 'index')
+            if len(renders) == 1:
+                purge_tags('author:0')
+            return HttpResponse()
+
+        factory = RequestFactory()
+        for _ in range(3):
+            request = factory.get('/racy/')
+            request.user = AnonymousUser()
+            view(request)
+        self.assertEqual(len(renders), 2)
+
+
+class PostFragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.user,
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        self.author_client = Client()
+        self.author_client.force_login(self.user)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.url = reverse('posts:profile', args=(self.user.username,))
+        cache.clear()
+
+    def test_fragment_keyed_by_updated_at(self):
+        """Карточка поста берется из кеша, пока пост не изменен"""
+        self.reader_client.get(self.url)
+        Post.objects.update(text='Тихая правка')
+        self.assertContains(self.reader_client.get(self.url), 'Тестовый пост')
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Новый текст'
+        post.save()
+        self.assertContains(self.reader_client.get(self.url), 'Новый текст')
+
+    def test_group_edit_refreshes_fragment(self):
+        """Переименование группы обновляет карточки ее постов"""
+        self.reader_client.get(self.url)
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+        self.assertContains(self.reader_client.get(self.url), 'Новое название')
+
+    def test_author_rename_refreshes_fragment(self):
+        """Переименование автора обновляет карточки его постов"""
+        index = reverse('posts:index')
+        api_url = reverse('api:index')
+        self.reader_client.get(index)
+        etag = self.reader_client.get(api_url)['ETag']
+        user = User.objects.get(pk=self.user.pk)
+        user.first_name, user.last_name = 'Новое', 'Имя'
+        user.save()
+        self.assertContains(self.reader_client.get(index), 'Новое Имя')
+        self.assertEqual(self.reader_client.get(
+            api_url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_login_keeps_fragment(self):
+        """Вход пользователя не сбрасывает карточки его постов"""
+        updated_at = self.post.updated_at
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password('GtaanGOO202_')
+        user.save(update_fields=['password'])
+        Client().login(username='testauthor', password='GtaanGOO202_')
+        self.assertEqual(
+            Post.objects.get(pk=self.post.pk).updated_at, updated_at)
+
+    def test_menu_outside_cache(self):
+        """Меню редактирования зависит от зрителя, а не от кеша"""
+        edit_url = reverse('posts:post_edit', args=(self.post.pk,))
+        self.assertContains(self.author_client.get(self.url), edit_url)
+        self.assertNotContains(self.reader_client.get(self.url), edit_url)
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Post, User
+
+
+class CommentPagingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.post = Post.objects.create(author=cls.user, text='Тестовый пост')
+        cls.total = settings.COMMENTS_LIMIT * 2 + 5
+        for number in range(cls.total):
+            Comment.objects.create(
+                post=cls.post, author=cls.user, text=f'Коммент {number}')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.detail_url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.fragment_url = reverse(
+            'posts:post_comments', args=(self.post.pk,))
+
+    def test_first_page_rendered(self):
+        """На странице поста выводится только первая страница комментариев"""
+        response = self.guest_client.get(self.detail_url)
+        comments = response.context['comments']
+        self.assertEqual(len(comments), settings.COMMENTS_LIMIT)
+        self.assertEqual(comments[0].text, f'Коммент {self.total - 1}')
+        self.assertContains(
+            response, f'{self.fragment_url}?cursor={comments.next_cursor}')
+
+    def test_fragment_pages(self):
+        """Фрагмент отдает следующие страницы до конца списка"""
+        seen = []
+        cursor = ''
+        while True:
+            response = self.guest_client.get(
+                self.fragment_url, {'cursor': cursor} if cursor else {})
+            self.assertTemplateUsed(
+                response, 'posts/includes/comment_list.html')
+            page = response.context['comments']
+            seen += [comment.text for comment in page]
+            if not page.next_cursor:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(len(seen), self.total)
+        self.assertEqual(len(set(seen)), self.total)
+
+    def test_detail_cost_bounded(self):
+        """Число запросов страницы поста не зависит от числа комментариев"""
+        with CaptureQueriesContext(connection) as many:
+            self.guest_client.get(self.detail_url)
+        post = Post.objects.create(author=self.user, text='Без комментариев')
+        cache.clear()
+        with CaptureQueriesContext(connection) as none:
+            self.guest_client.get(
+                reverse('posts:post_detail', args=(post.pk,)))
+        self.assertEqual(len(many), len(none))
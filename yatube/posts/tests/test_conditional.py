@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='testauthor')
+        cls.reader = User.objects.create_user(username='testreader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='testslug',
+            description='Тестовое описание',
+            author=cls.author,
+        )
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.detail = reverse('posts:post_detail', args=(self.post.pk,))
+        self.profile = reverse('posts:profile', args=(self.author.username,))
+        self.group_url = reverse('posts:group_list', args=(self.group.slug,))
+
+    def rename_group(self):
+        group = Group.objects.get(pk=self.group.pk)
+        group.title = 'Новое название'
+        group.save()
+
+    def rename_author(self):
+        author = User.objects.get(pk=self.author.pk)
+        author.first_name = f'Новое имя {author.first_name}'
+        author.save()
+
+    def edit_comment(self):
+        comment = Comment.objects.filter(post=self.post).first()
+        comment.text = 'Исправленный коммент'
+        comment.save()
+
+    def assertNotModified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.templates, [])
+
+    def assertModified(self, client, url, etag):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified(self):
+        """Неизменная страница отдается 304 без рендера шаблона"""
+        for url in (self.detail, self.profile, self.group_url):
+            with self.subTest(url=url):
+                etag = self.reader_client.get(url)['ETag']
+                self.assertNotModified(self.reader_client, url, etag)
+
+    def test_changes_invalidate_etag(self):
+        """Изменения данных страницы меняют ETag"""
+        changes = (
+            (self.detail, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Коммент')),
+            (self.detail, self.edit_comment),
+            (self.detail, lambda: Comment.objects.all().delete()),
+            (self.profile, lambda: Follow.objects.create(
+                user=self.reader, author=self.author)),
+            (self.group_url, lambda: Post.objects.create(
+                author=self.reader, text='Пост', group=self.group)),
+            (self.group_url, self.rename_group),
+            (self.group_url, self.rename_author),
+            (self.profile, self.rename_group),
+            (self.profile, self.rename_author),
+            (self.group_url, lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Коммент')),
+        )
+        for url, change in changes:
+            with self.subTest(url=url):
+                etag = self.reader_client.get(url)['ETag']
+                change()
+                self.assertModified(self.reader_client, url, etag)
+
+    def test_validators_skip_aggregates(self):
+        """ETag профиля и группы не пересчитывает посты"""
+        for url in (self.profile, self.group_url):
+            etag = self.reader_client.get(url)['ETag']
+            with self.subTest(url=url), CaptureQueriesContext(
+                    connection) as context:
+                self.assertNotModified(self.reader_client, url, etag)
+            self.assertFalse(any(
+                'posts_post' in query['sql']
+                for query in context.captured_queries))
+
+    def test_etag_depends_on_viewer(self):
+        """У разных зрителей разные ETag"""
+        author_client = Client()
+        author_client.force_login(self.author)
+        etag = self.reader_client.get(self.detail)['ETag']
+        self.assertModified(author_client, self.detail, etag)
+
+    def test_anonymous_cached_page(self):
+        """Страница из кеша для анонимов отдает 304 без запросов к БД"""
+        guest_client = Client()
+        etag = guest_client.get(self.detail)['ETag']
+        with self.assertNumQueries(0):
+            self.assertNotModified(guest_client, self.detail, etag)
@@ -0,0 +1,133 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..cache import feed_version
+from ..models import Comment, Follow, Post, User, UserStats
+
+
+class UserStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.follower = User.objects.create_user(username='testfollower')
+        cls.author = User.objects.create_user(username='testauthor')
+
+    def stats(self, user):
+        return UserStats.objects.values_list(
+            'posts_count', 'follows_count', 'followers_count').get(user=user)
+
+    def test_signals_keep_counters(self):
+        """Создание и удаление постов и подписок меняют счетчики"""
+        post = Post.objects.create(author=self.author, text='Пост')
+        Post.objects.create(author=self.author, text='Пост 2')
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.assertEqual(self.stats(self.author), (2, 0, 1))
+        self.assertEqual(self.stats(self.follower), (0, 1, 0))
+        post.delete()
+        Follow.objects.all().delete()
+        self.assertEqual(self.stats(self.author), (1, 0, 0))
+        self.assertEqual(self.stats(self.follower), (0, 0, 0))
+
+    def test_reconcile_command(self):
+        """reconcile_counters исправляет разошедшиеся счетчики"""
+        Post.objects.create(author=self.author, text='Пост')
+        UserStats.objects.update(posts_count=42, followers_count=7)
+        Post.objects.bulk_create([Post(author=self.author, text='Пост 2')])
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(self.stats(self.author), (2, 0, 0))
+
+    def test_profile_uses_stats(self):
+        """Профиль показывает счетчики автора из UserStats"""
+        Post.objects.create(author=self.author, text='Пост')
+        Follow.objects.create(user=self.follower, author=self.author)
+        UserStats.objects.filter(user=self.author).update(posts_count=5)
+        response = Client().get(reverse(
+            'posts:profile', args=(self.author.username,)))
+        self.assertEqual(response.context['stats'].posts_count, 5)
+        self.assertContains(response, 'постов 5')
+        self.assertContains(response, 'подписчиков 1')
+
+
+class CommentCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='testauthor')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+
+    def comment_count(self):
+        return Post.objects.values_list(
+            'comment_count', flat=True).get(pk=self.post.pk)
+
+    def test_signals_keep_comment_count(self):
+        """Создание и удаление комментариев меняют счетчик поста"""
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Коммент')
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Коммент 2')
+        self.assertEqual(self.comment_count(), 2)
+        comment.delete()
+        self.assertEqual(self.comment_count(), 1)
+
+    def test_post_delete_cost_independent_of_comments(self):
+        """Удаление поста не обрабатывает каждый комментарий отдельно"""
+        captured = []
+        for total in (1, 5):
+            post = Post.objects.create(author=self.author, text='Пост')
+            Comment.objects.bulk_create([
+                Comment(post=post, author=self.author, text='Коммент')
+                for _ in range(total)])
+            with CaptureQueriesContext(connection) as context:
+                post.delete()
+            captured.append(len(context.captured_queries))
+        self.assertEqual(captured[0], captured[1])
+
+    def test_failed_post_delete_keeps_counting(self):
+        """Сорвавшееся удаление поста не отключает счетчик комментариев"""
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Коммент')
+        with mock.patch('posts.signals.search.unindex',
+                        side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError), transaction.atomic():
+                self.post.delete()
+        comment.delete()
+        self.assertEqual(self.comment_count(), 0)
+
+    def test_comment_keeps_feed_version(self):
+        """Комментарий не сбрасывает поколение лент"""
+        version = feed_version()
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Коммент')
+        comment.delete()
+        self.assertEqual(feed_version(), version)
+
+    def test_reconcile_comment_count(self):
+        """reconcile_counters исправляет счетчики комментариев"""
+        Comment.objects.bulk_create([
+            Comment(post=self.post, author=self.author, text='Коммент')])
+        call_command('reconcile_counters', stdout=StringIO())
+        self.assertEqual(self.comment_count(), 1)
+
+    def test_feed_shows_comment_count(self):
+        """Карточки ленты показывают число комментариев без N+1"""
+        for number in range(3):
+            post = Post.objects.create(
+                author=self.author, text=f'Пост {number}')
+            Comment.objects.create(
+                post=post, author=self.author, text='Коммент')
+        client = Client()
+        client.force_login(self.author)
+        url = reverse('posts:index')
+        with self.assertNumQueries(3):
+            response = client.get(url)
+        self.assertContains(response, 'Комментариев: 1', count=3)
+        self.assertContains(response, 'Комментариев: 0', count=1)
+        Comment.objects.create(post=post, author=self.author, text='Еще')
+        response = client.get(url)
+        self.assertContains(response, 'Комментариев: 2', count=1)
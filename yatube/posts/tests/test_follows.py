@@ -0,0 +1,225 @@
+from contextlib import contextmanager
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts import counters, follows, suggestions
+from posts.models import Follow, FollowSuggestion, Post, Timeline, User
+
+
+@contextmanager
+def commit_hooks():
+    """Выполняет on_commit-колбэки, зарегистрированные внутри блока.
+
+    TestCase не коммитит транзакцию, поэтому сами они не срабатывают.
+    """
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
+
+
+class BulkFollowTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(3)
+        ]
+        for author in cls.authors:
+            Post.objects.create(author=author, text=f'Пост {author}')
+
+    def setUp(self):
+        cache.clear()
+
+    def ids(self, users):
+        return [user.pk for user in users]
+
+    def test_follow_many(self):
+        """Подписка набором обновляет ленту и счетчики"""
+        Follow.objects.create(user=self.reader, author=self.authors[0])
+        with commit_hooks():
+            created = follows.follow_many(
+                self.reader, self.ids(self.authors) + [self.reader.pk, 0])
+        self.assertEqual(created, set(self.ids(self.authors[1:])))
+        self.assertEqual(
+            Follow.objects.filter(user=self.reader).count(), 3)
+        self.assertEqual(Timeline.objects.filter(user=self.reader).count(), 3)
+        self.reader.stats.refresh_from_db()
+        self.assertEqual(self.reader.stats.follows_count, 3)
+        for author in self.authors:
+            with self.subTest(author=author.username):
+                author.stats.refresh_from_db()
+                self.assertEqual(author.stats.followers_count, 1)
+
+    def test_follow_many_queries(self):
+        """Число запросов не зависит от числа авторов"""
+        counters.reconcile()
+        with self.assertNumQueries(12), commit_hooks():
+            follows.follow_many(self.reader, self.ids(self.authors[:1]))
+        Follow.objects.all().delete()
+        with self.assertNumQueries(12), commit_hooks():
+            follows.follow_many(self.reader, self.ids(self.authors))
+
+    def test_unfollow_many(self):
+        """Отписка набором чистит ленту и счетчики"""
+        with commit_hooks():
+            follows.follow_many(self.reader, self.ids(self.authors))
+            removed = follows.unfollow_many(
+                self.reader, self.ids(self.authors[:2]) + [self.reader.pk])
+        self.assertEqual(removed, set(self.ids(self.authors[:2])))
+        self.assertEqual(list(Timeline.objects.filter(
+            user=self.reader).values_list('author_id', flat=True)),
+            [self.authors[2].pk])
+        self.reader.stats.refresh_from_db()
+        self.assertEqual(self.reader.stats.follows_count, 1)
+        self.authors[0].stats.refresh_from_db()
+        self.assertEqual(self.authors[0].stats.followers_count, 0)
+        self.assertEqual(follows.unfollow_many(self.reader, [0]), set())
+
+    def test_unfollow_many_queries(self):
+        """Отписка не обрабатывает каждую подписку отдельно"""
+        counters.reconcile()
+        follows.follow_many(self.reader, self.ids(self.authors[:1]))
+        with CaptureQueriesContext(connection) as one:
+            follows.unfollow_many(self.reader, self.ids(self.authors[:1]))
+        follows.follow_many(self.reader, self.ids(self.authors))
+        with CaptureQueriesContext(connection) as many:
+            follows.unfollow_many(self.reader, self.ids(self.authors))
+        self.assertEqual(
+            len(one.captured_queries), len(many.captured_queries))
+        self.assertFalse(Follow.objects.filter(user=self.reader).exists())
+
+
+class FollowSuggestionTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader, cls.friend, cls.other, cls.star, cls.niche = (
+            User.objects.create_user(username=name)
+            for name in ('reader', 'friend', 'other', 'star', 'niche'))
+        for user, author in (
+            (cls.reader, cls.friend),
+            (cls.reader, cls.other),
+            (cls.friend, cls.star),
+            (cls.other, cls.star),
+            (cls.friend, cls.niche),
+            (cls.friend, cls.reader),
+            (cls.other, cls.friend),
+        ):
+            Follow.objects.create(user=user, author=author)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_compute(self):
+        """Кандидаты — подписки подписок без себя и уже отслеживаемых"""
+        call_command('compute_suggestions', stdout=StringIO())
+        self.assertEqual(
+            list(self.reader.follow_suggestions.values_list(
+                'author__username', 'score')),
+            [('star', 2), ('niche', 1)])
+        self.assertEqual(
+            list(self.other.follow_suggestions.values_list(
+                'author__username', 'score')),
+            [('reader', 1), ('niche', 1)])
+
+    def test_compute_limit(self):
+        """Для читателя хранится не больше limit предложений"""
+        suggestions.compute(limit=1)
+        self.assertEqual(
+            list(self.reader.follow_suggestions.values_list(
+                'author__username', flat=True)), ['star'])
+
+    def test_widget_one_query(self):
+        """Виджет предложений читает их одним запросом"""
+        suggestions.compute()
+        with self.assertNumQueries(1):
+            shown = suggestions.for_user(self.reader)
+            [suggestion.author.username for suggestion in shown]
+        client = Client()
+        client.force_login(self.reader)
+        response = client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Кого почитать')
+        self.assertContains(
+            response, reverse('posts:profile_follow', args=['star']))
+
+    def test_follow_removes_suggestion(self):
+        """Подписка убирает автора из предложений"""
+        suggestions.compute()
+        Follow.objects.create(user=self.reader, author=self.star)
+        follows.follow_many(self.reader, [self.niche.pk])
+        self.assertFalse(FollowSuggestion.objects.filter(
+            user=self.reader).exists())
+
+
+class FollowedCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.authors = [
+            User.objects.create_user(username=f'author{number}')
+            for number in range(4)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_batch_lookup_from_cache(self):
+        """Подписки на список авторов проверяются без запросов"""
+        for author in self.authors[1:3]:
+            Follow.objects.create(user=self.reader, author=author)
+        ids = [author.pk for author in self.authors] + [0]
+        with self.assertNumQueries(1):
+            follows.followed_among(self.reader, ids)
+        with self.assertNumQueries(0):
+            followed = follows.followed_among(self.reader, ids)
+        self.assertEqual(followed, {self.authors[1].pk, self.authors[2].pk})
+        self.assertEqual(list(follows.followed_ids(self.reader.pk)),
+                         sorted(followed))
+
+    def test_invalidation(self):
+        """Подписки и отписки сбрасывают кеш читателя"""
+        author = self.authors[0]
+        self.assertFalse(follows.is_following(self.reader, author.pk))
+        follow = Follow.objects.create(user=self.reader, author=author)
+        self.assertTrue(follows.is_following(self.reader, author.pk))
+        follow.delete()
+        self.assertFalse(follows.is_following(self.reader, author.pk))
+        with commit_hooks():
+            follows.follow_many(self.reader, [author.pk])
+            # До коммита кеш не сбрасывается.
+            self.assertFalse(follows.is_following(self.reader, author.pk))
+        self.assertTrue(follows.is_following(self.reader, author.pk))
+        with commit_hooks():
+            follows.unfollow_many(self.reader, [author.pk])
+        self.assertFalse(follows.is_following(self.reader, author.pk))
+
+    def test_anonymous(self):
+        """Аноним ни на кого не подписан"""
+        client = Client()
+        response = client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            self.assertEqual(follows.followed_among(
+                response.wsgi_request.user, [self.authors[0].pk]), set())
+
+    def test_profile_button(self):
+        """Кнопка на профиле отражает подписку"""
+        client = Client()
+        client.force_login(self.reader)
+        author = self.authors[0]
+        url = reverse('posts:profile', args=[author.username])
+        follow_url = reverse('posts:profile_follow', args=[author.username])
+        self.assertContains(client.get(url), follow_url)
+        client.get(follow_url)
+        self.assertNotContains(client.get(url), follow_url)
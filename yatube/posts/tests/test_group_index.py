@@ -0,0 +1,68 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, Post, User
+
+
+class GroupIndexTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.groups = {
+            title: Group.objects.create(
+                title=title, slug=slug, description='Описание',
+                author=cls.user)
+            for title, slug in (('Альфа', 'alpha'), ('Бета', 'beta'),
+                                ('Гамма', 'gamma'))
+        }
+        now = timezone.now()
+        for title, posts, age in (('Альфа', 3, 10), ('Бета', 1, 1)):
+            for _ in range(posts):
+                post = Post.objects.create(
+                    author=cls.user, text='Пост', group=cls.groups[title])
+                Post.objects.filter(pk=post.pk).update(
+                    pub_date=now - timedelta(days=age))
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.url = reverse('posts:group_index')
+
+    def titles(self, sort=None):
+        response = self.client.get(self.url, {'sort': sort} if sort else {})
+        return [group.title for group in response.context['page_obj']]
+
+    def test_sorting(self):
+        """Группы сортируются по активности, числу постов и названию"""
+        self.assertEqual(self.titles(), ['Бета', 'Альфа', 'Гамма'])
+        self.assertEqual(self.titles('posts'), ['Альфа', 'Бета', 'Гамма'])
+        self.assertEqual(self.titles('title'), ['Альфа', 'Бета', 'Гамма'])
+        self.assertEqual(self.titles('bogus'), self.titles('activity'))
+
+    def test_stats_in_one_query(self):
+        """Статистика групп считается одним запросом и кешируется"""
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url)
+        group = response.context['page_obj'][1]
+        self.assertEqual((group.title, group.posts_count), ('Альфа', 3))
+        self.assertContains(response, 'Постов: 3')
+        # Из базы читаются только группы текущей страницы.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertContains(response, 'Постов: 3')
+
+    def test_cache_invalidated_by_new_post(self):
+        """Новый пост сбрасывает закешированный список групп"""
+        self.client.get(self.url)
+        Post.objects.create(
+            author=self.user, text='Пост', group=self.groups['Гамма'])
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['page_obj'][0].title, 'Гамма')
+        content = response.content.decode()
+        self.assertLess(content.index('Гамма'), content.index('Бета'))
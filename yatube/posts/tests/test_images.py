@@ -0,0 +1,141 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, features
+
+from ..forms import PostForm
+from ..images import derivative_formats, pregenerate
+from ..models import Post, User
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class ThumbnailPregenerationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            image=SimpleUploadedFile(
+                name='small.gif',
+                content=SMALL_GIF,
+                content_type='image/gif'),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_render_without_resizing(self):
+        """После предгенерации страница не создает миниатюр"""
+        pregenerate(self.post.image)
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend._create_thumbnail'
+        ) as create:
+            response = Client().get(reverse(
+                'posts:profile', args=(self.user.username,)))
+        create.assert_not_called()
+        self.assertContains(response, '<picture>')
+        for width in settings.POST_IMAGE_WIDTHS:
+            with self.subTest(width=width):
+                self.assertContains(response, f' {width}w')
+
+    def test_render_original_before_pregeneration(self):
+        """Без производных страница выводит оригинал, ничего не уменьшая"""
+        with mock.patch(
+            'sorl.thumbnail.base.ThumbnailBackend._create_thumbnail'
+        ) as create:
+            response = Client().get(reverse(
+                'posts:profile', args=(self.user.username,)))
+        create.assert_not_called()
+        self.assertNotContains(response, '<picture>')
+        self.assertContains(response, f'src="{self.post.image.url}"')
+
+    def test_derivative_formats(self):
+        """Производные строятся в WebP (если доступен) и исходном формате"""
+        formats = derivative_formats(self.post.image)
+        self.assertEqual(formats[-1], 'GIF')
+        self.assertEqual(formats[0] == 'WEBP', features.check('webp'))
+
+
+def make_upload(size, image_format='PNG', name='image.png'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'white').save(buffer, format=image_format)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_MAX_SIDE=100,
+    POST_IMAGE_MAX_PIXELS=200 * 200,
+)
+class PostImageIngestTests(TestCase):
+    def validate(self, upload):
+        form = PostForm(data={'text': 'Пост'}, files={'image': upload})
+        form.is_valid()
+        return form
+
+    def test_downscale_oversized(self):
+        """Оригинал больше лимита уменьшается при загрузке"""
+        form = self.validate(make_upload((150, 60)))
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as image:
+            self.assertEqual(image.size, (100, 40))
+            self.assertEqual(image.format, 'PNG')
+
+    def test_downscale_keeps_orientation(self):
+        """При уменьшении поворот из EXIF применяется к картинке"""
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        buffer = BytesIO()
+        Image.new('RGB', (150, 60), 'white').save(
+            buffer, format='JPEG', exif=exif)
+        form = self.validate(
+            SimpleUploadedFile('image.jpg', buffer.getvalue()))
+        self.assertTrue(form.is_valid(), form.errors)
+        with Image.open(form.cleaned_data['image']) as image:
+            self.assertEqual(image.size, (40, 100))
+
+    def test_small_image_untouched(self):
+        """Картинка в пределах лимита сохраняется как есть"""
+        upload = make_upload((80, 60))
+        form = self.validate(upload)
+        self.assertIs(form.cleaned_data['image'], upload)
+
+    def test_rejects_by_header(self):
+        """Слишком большие и неподдерживаемые картинки отклоняются"""
+        uploads = (
+            (make_upload((300, 300)), 'image_pixels'),
+            (make_upload((10, 10), 'BMP', 'image.bmp'), 'image_format'),
+            (SimpleUploadedFile('image.png', b'not an image'),
+             'invalid_image'),
+        )
+        for upload, code in uploads:
+            with self.subTest(code=code):
+                form = self.validate(upload)
+                self.assertFalse(form.is_valid())
+                self.assertEqual(
+                    form.errors.as_data()['image'][0].code, code)
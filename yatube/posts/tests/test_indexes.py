@@ -0,0 +1,77 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+from ..models import Comment, Follow, Group, Post, User
+
+
+class FeedQueryPlanTests(TestCase):
+    """Ленты должны читаться по индексам, без полного скана и сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.users = [
+            User.objects.create_user(username=f'user{number}')
+            for number in range(5)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}',
+                slug=f'group{number}',
+                description='Тестовое описание',
+                author=cls.users[0],
+            )
+            for number in range(3)
+        ]
+        for user in cls.users[1:]:
+            Follow.objects.create(user=cls.users[0], author=user)
+        for number in range(60):
+            post = Post.objects.create(
+                author=cls.users[number % 5],
+                group=cls.groups[number % 3],
+                text=f'Пост {number}',
+            )
+            Comment.objects.create(
+                post=post,
+                author=cls.users[0],
+                text=f'Комментарий {number}',
+            )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def setUp(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assertIndexed(self, queryset):
+        plan = queryset[:settings.UPDATETS_LIMIT].explain()
+        if connection.vendor == 'postgresql':
+            fallback = 'Seq Scan' in plan and 'Sort' in plan
+        else:
+            fallback = 'TEMP B-TREE' in plan or bool(re.search(
+                r'SCAN (TABLE )?\w+\s*$', plan, re.MULTILINE))
+        self.assertFalse(fallback, plan)
+
+    def test_feed_plans(self):
+        """Планы запросов лент используют составные индексы"""
+        author, group = self.users[1], self.groups[1]
+        feeds = (
+            ('index', Post.objects.select_related('author', 'group')),
+            ('group', group.posts.select_related('author')),
+            ('profile', author.posts.select_related('group')),
+            ('follow', self.users[0].timeline.select_related(
+                'post__author', 'post__group')),
+            ('comments', Post.objects.first().comments.select_related(
+                'author')),
+            ('followers', Follow.objects.filter(author=author)),
+        )
+        for name, queryset in feeds:
+            with self.subTest(feed=name):
+                self.assertIndexed(queryset.all())
+            with self.subTest(feed=name, ordering='cursor'):
+                self.assertIndexed(queryset.order_by('-pub_date', '-id')
+                                   if name != 'followers' else queryset)
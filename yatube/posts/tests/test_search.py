@@ -0,0 +1,80 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import search
+from ..models import Group, Post, User
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        cls.group = Group.objects.create(
+            title='Кошки',
+            slug='cats',
+            description='Все о домашних кошках',
+            author=cls.user,
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Рыжий кот спит на подоконнике',
+            group=cls.group,
+        )
+        Post.objects.create(author=cls.user, text='Собака гуляет во дворе')
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.url = reverse('posts:search')
+
+    def test_search_finds_posts_and_groups(self):
+        """Поиск находит посты и группы по словам"""
+        response = self.guest_client.get(self.url, {'q': 'кот подоконнике'})
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        response = self.guest_client.get(self.url, {'q': 'домашних'})
+        self.assertEqual(response.context['groups'], [self.group])
+        self.assertEqual(len(response.context['page_obj']), 0)
+
+    def test_groups_in_rank_order(self):
+        """Группы выводятся в порядке ранга, а не id"""
+        best = Group.objects.create(
+            title='Кошки и кошки',
+            slug='more-cats',
+            description='Кошки, кошки, кошки',
+            author=self.user,
+        )
+        ranked = search.search_ids(Group, 'кошки')
+        self.assertEqual(ranked, [best.pk, self.group.pk])
+        response = self.guest_client.get(self.url, {'q': 'кошки'})
+        self.assertEqual(response.context['groups'], [best, self.group])
+
+    def test_index_follows_changes(self):
+        """Правка и удаление поста обновляют индекс"""
+        post = Post.objects.get(pk=self.post.pk)
+        post.text = 'Серый кролик'
+        post.save()
+        self.assertEqual(search.search_ids(Post, 'кот'), [])
+        self.assertEqual(search.search_ids(Post, 'кролик'), [post.pk])
+        post.delete()
+        self.assertEqual(search.search_ids(Post, 'кролик'), [])
+
+    def test_rebuild_command(self):
+        """rebuild_search_index индексирует записи, созданные в обход
+        сигналов"""
+        Post.objects.bulk_create([Post(author=self.user, text='Попугай')])
+        self.assertEqual(search.search_ids(Post, 'попугай'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search.search_ids(Post, 'попугай')), 1)
+
+    def test_admin_search(self):
+        """Поиск в админке идет по индексу"""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'собака'})
+        self.assertEqual(response.context['cl'].result_count, 1)
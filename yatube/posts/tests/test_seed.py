@@ -0,0 +1,39 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import Count, F
+from django.test import TestCase
+
+from .. import search
+from ..models import Comment, Follow, Group, Post, Timeline, User, UserStats
+
+
+class SeedDataTests(TestCase):
+    def test_seed_data_command(self):
+        """seed_data создает данные и пересчитывает производные"""
+        call_command(
+            'seed_data', users=30, groups=5, posts=200, comments=300,
+            follows=100, batch_size=64, seed=1, stdout=StringIO())
+        self.assertEqual(User.objects.count(), 30)
+        self.assertEqual(Group.objects.count(), 5)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertEqual(Follow.objects.count(), 100)
+        self.assertEqual(UserStats.objects.count(), 30)
+        self.assertTrue(Timeline.objects.exists())
+        post = Post.objects.first()
+        self.assertIn(post.pk, search.search_ids(Post, post.text))
+        self.assertGreater(
+            Post.objects.dates('pub_date', 'month').count(), 1)
+        self.assertFalse(Comment.objects.filter(
+            pub_date__lt=F('post__pub_date')).exists())
+
+    def test_follows_are_skewed(self):
+        """Подписки распределены с перекосом в пользу популярных авторов"""
+        call_command(
+            'seed_data', users=100, groups=0, posts=0, comments=0,
+            follows=1000, seed=2, stdout=StringIO())
+        counts = list(Follow.objects.values('author').annotate(
+            total=Count('pk')).order_by('-total').values_list(
+                'total', flat=True))
+        self.assertGreater(sum(counts[:20]), sum(counts) / 2)
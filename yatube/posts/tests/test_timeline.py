@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..models import Follow, Post, Timeline, User
+
+
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.follower = User.objects.create_user(username='testfollower')
+        cls.author = User.objects.create_user(username='testauthor')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Старый пост',
+        )
+
+    def timeline_posts(self):
+        return list(self.follower.timeline.values_list('post', flat=True))
+
+    def test_follow_fills_timeline(self):
+        """Подписка добавляет в ленту уже опубликованные посты"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        self.assertEqual(self.timeline_posts(), [self.old_post.pk])
+
+    def test_new_post_fans_out(self):
+        """Новый пост попадает в ленты подписчиков"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(self.timeline_posts(), [post.pk, self.old_post.pk])
+        entry = self.follower.timeline.first()
+        self.assertEqual(entry.pub_date, post.pub_date)
+        self.assertEqual(entry.author, self.author)
+
+    def test_cleanup(self):
+        """Удаление поста и отписка чистят ленту"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        post.delete()
+        self.assertEqual(self.timeline_posts(), [self.old_post.pk])
+        Follow.objects.filter(user=self.follower).delete()
+        self.assertEqual(self.timeline_posts(), [])
+
+    def test_backfill_command(self):
+        """Команда backfill_timeline восстанавливает ленты"""
+        Follow.objects.create(user=self.follower, author=self.author)
+        Timeline.objects.all().delete()
+        call_command('backfill_timeline', stdout=StringIO())
+        self.assertEqual(self.timeline_posts(), [self.old_post.pk])
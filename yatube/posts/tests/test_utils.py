@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Post, User
+from ..utils import CursorPage, CursorPaginator
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testauthor')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Post {number}')
+            for number in range(13)
+        )
+        cls.posts = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(), 5)
+        cache.clear()
+
+    def test_walk_forward_and_back(self):
+        """Курсоры проходят ленту вперед и назад без пропусков"""
+        pages = []
+        page = self.paginator.get_page(None)
+        pages.append(list(page))
+        while page.has_next():
+            page = self.paginator.get_page(page.next_cursor)
+            pages.append(list(page))
+        self.assertEqual(sum(pages, []), self.posts)
+        self.assertEqual([len(items) for items in pages], [5, 5, 3])
+        while page.has_previous():
+            page = self.paginator.get_page(page.previous_cursor)
+            self.assertEqual(list(page), pages.pop(-2))
+        self.assertFalse(page.has_previous())
+
+    def test_page_without_count(self):
+        """Страница получается одним запросом без COUNT"""
+        cursor = self.paginator.get_page(None).next_cursor
+        with self.assertNumQueries(1):
+            page = self.paginator.get_page(cursor)
+        self.assertIsInstance(page, CursorPage)
+        self.assertEqual(page[0], self.posts[5])
+
+    def test_broken_cursor(self):
+        """Испорченный курсор открывает первую страницу"""
+        for cursor in ('garbage', 'W10', '!!!'):
+            with self.subTest(cursor=cursor):
+                page = self.paginator.get_page(cursor)
+                self.assertEqual(list(page), self.posts[:5])
+                self.assertIsNone(page.number)
+
+    @override_settings(CURSOR_PAGING=True)
+    def test_feed_views_cursor_links(self):
+        """Ленты в режиме курсоров выводят ссылки «Новее/Старше»"""
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(reverse(
+            'posts:profile', args=(self.user.username,)))
+        page = response.context['page_obj']
+        self.assertIsInstance(page, CursorPage)
+        self.assertContains(response, f'?cursor={page.next_cursor}')
+        response = client.get(reverse(
+            'posts:profile',
+            args=(self.user.username,)) + f'?cursor={page.next_cursor}')
+        self.assertEqual(len(response.context['page_obj']), 3)
+        self.assertContains(response, 'Новее')
+        self.assertNotContains(response, 'Старше')
@@ -181,7 +181,7 @@ class PostsViewTests(TestCase):
         """Проверка кеширования данных главной страницы"""
         response1 = self.authorized_client.get(reverse(
             'posts:index'))
-        Post.objects.all().delete()
+        Post.objects.update(text='Измененный в обход сигналов пост')
         response2 = self.authorized_client.get(reverse(
             'posts:index'))
         self.assertEqual(
@@ -194,6 +194,17 @@ class PostsViewTests(TestCase):
             response1.content,
             response3.content)
 
+    def test_cache_index_invalidation(self):
+        """Удаление поста сразу сбрасывает кеш главной страницы"""
+        response1 = self.authorized_client.get(reverse(
+            'posts:index'))
+        Post.objects.all().delete()
+        response2 = self.authorized_client.get(reverse(
+            'posts:index'))
+        self.assertNotEqual(
+            response1.content,
+            response2.content)
+
     def test_following(self):
         """Проверка работы подписок"""
         count1 = Follow.objects.count()
@@ -0,0 +1,52 @@
+from django.conf import settings
+
+from .models import Follow, Post, Timeline
+
+
+def _insert(entries):
+    batch = []
+    created = 0
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == settings.TIMELINE_BATCH_SIZE:
+            Timeline.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+            batch = []
+    if batch:
+        Timeline.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    return created
+
+
+def fan_out(post):
+    """Раскладывает новый пост в ленты всех подписчиков автора."""
+    followers = Follow.objects.filter(
+        author_id=post.author_id).values_list('user_id', flat=True)
+    return _insert(
+        Timeline(
+            user_id=user_id,
+            post_id=post.pk,
+            author_id=post.author_id,
+            pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def fan_in(user_id, author_ids):
+    """Добавляет в ленту читателя уже опубликованные посты авторов."""
+    posts = Post.objects.filter(author_id__in=author_ids).values_list(
+        'pk', 'author_id', 'pub_date')
+    return _insert(
+        Timeline(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date)
+        for post_id, author_id, pub_date in posts.iterator()
+    )
+
+
+def drop(user_id, author_id):
+    """Убирает посты автора из ленты отписавшегося читателя."""
+    return Timeline.objects.filter(
+        user_id=user_id, author_id=author_id).delete()[0]
@@ -9,9 +9,15 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:group_list>/', views.group_posts, name='group_list'),
     path('groups/', views.group_index, name='group_index'),
+    path('search/', views.search_posts, name='search'),
     path('groups/create/', views.group_create, name='group_create'),
     path('profile/<str:username>/', views.profile, name='profile'),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
     path('posts/<int:post_id>/delete/', views.post_delete, name='post_delete'),
@@ -1,8 +1,161 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
 
 
-def paging(request, value):
-    paginator = Paginator(value, settings.UPDATETS_LIMIT)
+def paging(request, value, cursor=False, per_page=None):
+    per_page = per_page or settings.UPDATETS_LIMIT
+    if cursor:
+        paginator = CursorPaginator(value, per_page)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = Paginator(value, per_page)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+class CursorPaginator:
+    """Keyset-пагинация: страницы отсчитываются от ключа сортировки
+    последней показанной записи, поэтому нет ни COUNT(*), ни OFFSET.
+
+    Ключ строится по сортировке queryset (или ordering модели) и
+    дополняется pk, чтобы записи с одинаковой датой не терялись.
+    """
+
+    def __init__(self, object_list, per_page, ordering=None):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.model = object_list.model
+        self.ordering = self._get_ordering(ordering)
+
+    def _get_ordering(self, ordering):
+        ordering = list(
+            ordering
+            or self.object_list.query.order_by
+            or self.model._meta.ordering
+        )
+        pk_name = self.model._meta.pk.name
+        names = [self._field_name(field) for field in ordering]
+        if pk_name not in names:
+            desc = bool(ordering) and ordering[-1].startswith('-')
+            ordering.append(f'-{pk_name}' if desc else pk_name)
+        return tuple(
+            (self._field_name(field), field.startswith('-'))
+            for field in ordering
+        )
+
+    def _field_name(self, field):
+        name = field.lstrip('-')
+        return self.model._meta.pk.name if name == 'pk' else name
+
+    def _order_by(self, backwards):
+        return [
+            f'-{name}' if desc != backwards else name
+            for name, desc in self.ordering
+        ]
+
+    def _key(self, obj):
+        return [
+            getattr(obj, self.model._meta.get_field(name).attname)
+            for name, _ in self.ordering
+        ]
+
+    def encode(self, backwards, obj):
+        payload = json.dumps(
+            [int(backwards), self._key(obj)],
+            default=str,
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(
+            payload.encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        """Разбирает курсор; для испорченного курсора возвращает None."""
+        if not cursor:
+            return None
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            backwards, values = json.loads(
+                base64.urlsafe_b64decode(padded.encode()))
+            if len(values) != len(self.ordering):
+                return None
+            values = [
+                self.model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        return bool(backwards), values
+
+    def _after(self, values, backwards):
+        condition = Q()
+        keys = list(zip(self.ordering, values))
+        for index, ((name, desc), value) in enumerate(keys):
+            lookup = 'lt' if desc != backwards else 'gt'
+            step = Q(**{f'{name}__{lookup}': value})
+            for (prev_name, _), prev_value in keys[:index]:
+                step &= Q(**{prev_name: prev_value})
+            condition |= step
+        return condition
+
+    def get_page(self, cursor):
+        position = self.decode(cursor)
+        backwards = bool(position) and position[0]
+        queryset = self.object_list.order_by(*self._order_by(backwards))
+        if position:
+            queryset = queryset.filter(self._after(position[1], backwards))
+        items = list(queryset[:self.per_page + 1])
+        has_more = len(items) > self.per_page
+        items = items[:self.per_page]
+        if backwards:
+            if not items:
+                return self.get_page(None)
+            items.reverse()
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else position is not None
+        return CursorPage(
+            items,
+            self,
+            number=cursor if position else None,
+            next_cursor=(
+                self.encode(False, items[-1])
+                if has_next and items else None),
+            previous_cursor=(
+                self.encode(True, items[0])
+                if has_previous and items else None),
+        )
+
+
+class CursorPage(Sequence):
+    """Страница keyset-пагинации с интерфейсом, близким к Page."""
+
+    def __init__(self, object_list, paginator, number=None,
+                 next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.number = number
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page {self.number or "first"}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
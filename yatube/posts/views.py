@@ -1,33 +1,95 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.db.models import Count, F, Max
 from django.shortcuts import get_object_or_404, render, redirect
+from django.utils.http import urlencode
+from django.views.decorators.http import condition
 
+from core.cache import get_cached_or_404
+from core.db_router import versioned_timeout
+from core.middleware import query_budget
+
+from . import conditional, counters, follows, images, search, suggestions
+from .cache import (
+    add_cache_tags, cache_anonymous_page, comments_stamp, feed_version)
 from .forms import PostForm, CommentForm, GroupForm
 from .models import Group, Post, User, Follow, Comment
 from .utils import paging
 
 
+GROUP_ORDERINGS = {
+    'activity': (F('last_post').desc(nulls_last=True), 'title', 'pk'),
+    'posts': ('-posts_count', 'title', 'pk'),
+    'title': ('title', 'pk'),
+}
+
+GROUP_INDEX_KEY = 'posts:group_index:{}:{}'
+
+
+@query_budget(8)
+@cache_anonymous_page
 def index(request):
     posts = Post.objects.select_related('author', 'group').all()
-    page_obj = paging(request, posts)
+    page_obj = paging(request, posts, cursor=settings.CURSOR_PAGING)
+    add_cache_tags(request, 'index', posts=page_obj)
     context = {
         'page_obj': page_obj,
+        'feed_version': feed_version(),
+        'comments_stamp': comments_stamp(page_obj),
     }
     return render(request, 'posts/index.html', context)
 
 
+@query_budget(6)
 def group_index(request):
-    groups = Group.objects.all()
-    page_obj = paging(request, groups)
+    sort = request.GET.get('sort')
+    if sort not in GROUP_ORDERINGS:
+        sort = 'activity'
+    page_obj = paging(request, _group_stats(sort, feed_version()))
+    rows, page_obj.object_list = page_obj.object_list, []
+    groups = Group.objects.in_bulk([pk for pk, _, _ in rows])
+    for pk, posts_count, last_post in rows:
+        if pk in groups:
+            group = groups[pk]
+            group.posts_count, group.last_post = posts_count, last_post
+            page_obj.object_list.append(group)
     context = {
         'page_obj': page_obj,
+        'sort': sort,
+        'extra_query': urlencode({'sort': sort}) + '&',
     }
     return render(request, 'posts/group_index.html', context)
 
 
+def _group_stats(sort, version):
+    """Тройки (pk, число постов, дата последнего поста) в порядке sort.
+
+    Агрегат по всем постам считается один раз на поколение лент: оно
+    меняется при любом изменении постов и групп. Сами группы страницы
+    читаются отдельно, поэтому в кеше лежат только числа.
+    """
+    key = GROUP_INDEX_KEY.format(sort, version)
+    stats = cache.get(key)
+    if stats is None:
+        stats = list(Group.objects.annotate(
+            posts_count=Count('posts'),
+            last_post=Max('posts__pub_date'),
+        ).order_by(*GROUP_ORDERINGS[sort]).values_list(
+            'pk', 'posts_count', 'last_post'))
+        cache.set(
+            key, stats, versioned_timeout(settings.FEED_CACHE_TIMEOUT))
+    return stats
+
+
+@query_budget(10)
+@cache_anonymous_page
+@condition(etag_func=conditional.group_posts_etag)
 def group_posts(request, group_list):
-    group = get_object_or_404(Group, slug=group_list)
+    group = get_cached_or_404(Group, slug=group_list)
     posts = group.posts.select_related('author').all()
-    page_obj = paging(request, posts)
+    page_obj = paging(request, posts, cursor=settings.CURSOR_PAGING)
+    add_cache_tags(request, f'group:{group.pk}', posts=page_obj)
     context = {
         'group': group,
         'page_obj': page_obj,
@@ -35,6 +97,27 @@ def group_posts(request, group_list):
     return render(request, 'posts/group_list.html', context)
 
 
+@query_budget(8)
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    page_obj = paging(request, search.search_ids(Post, query))
+    posts = Post.objects.select_related('author', 'group').in_bulk(
+        page_obj.object_list)
+    page_obj.object_list = [
+        posts[pk] for pk in page_obj.object_list if pk in posts]
+    group_ids = search.search_ids(
+        Group, query, limit=settings.SEARCH_GROUPS_LIMIT)
+    groups = Group.objects.in_bulk(group_ids)
+    context = {
+        'query': query,
+        'groups': [groups[pk] for pk in group_ids if pk in groups],
+        'page_obj': page_obj,
+        'extra_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@query_budget(6)
 @login_required
 def group_create(request):
     form = GroupForm(request.POST or None)
@@ -46,34 +129,63 @@ def group_create(request):
     return redirect('posts:group_index')
 
 
+@query_budget(16)
+@cache_anonymous_page
+@condition(etag_func=conditional.profile_etag)
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_cached_or_404(User, username=username)
+    stats = counters.get_stats(author)
     posts = author.posts.select_related('group').all()
-    page_obj = paging(request, posts)
-    following = request.user.is_authenticated and author.following.filter(
-        user=request.user).exists()
+    page_obj = paging(request, posts, cursor=settings.CURSOR_PAGING)
+    add_cache_tags(request, f'author:{author.pk}', posts=page_obj)
+    following = follows.is_following(request.user, author.pk)
     context = {
         'author': author,
+        'stats': stats,
         'page_obj': page_obj,
         'following': following,
     }
     return render(request, 'posts/profile.html', context)
 
 
+@query_budget(12)
+@cache_anonymous_page
+@condition(etag_func=conditional.post_detail_etag)
 def post_detail(request, post_id):
     post = get_object_or_404(
-        Post.objects.select_related('author').prefetch_related(
-            'comments__author'),
-        id=post_id)
+        Post.objects.select_related('author', 'group'), id=post_id)
+    add_cache_tags(request, f'comments:{post.pk}', posts=(post,))
     form = CommentForm(request.POST or None)
     context = {
         'post': post,
-        'comments': post.comments.all(),
+        'comments': _comments_page(request, post),
         'form': form
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+def _comments_page(request, post):
+    return paging(
+        request,
+        post.comments.select_related('author'),
+        cursor=True,
+        per_page=settings.COMMENTS_LIMIT,
+    )
+
+
+@query_budget(4)
+@cache_anonymous_page
+def post_comments(request, post_id):
+    post = get_object_or_404(Post.objects.only('pk'), id=post_id)
+    add_cache_tags(request, f'comments:{post.pk}')
+    context = {
+        'post': post,
+        'comments': _comments_page(request, post),
+    }
+    return render(request, 'posts/includes/comment_list.html', context)
+
+
+@query_budget(15)
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
@@ -82,9 +194,11 @@ def post_create(request):
     new_post = form.save(commit=False)
     new_post.author = request.user
     new_post.save()
+    images.schedule(new_post)
     return redirect('posts:profile', request.user.username)
 
 
+@query_budget(12)
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -97,9 +211,12 @@ def post_edit(request, post_id):
     if not form.is_valid():
         return render(request, 'posts/post_create.html', {'form': form})
     form.save()
+    if 'image' in form.changed_data:
+        images.schedule(post)
     return redirect('posts:post_detail', post_id)
 
 
+@query_budget(15)
 @login_required
 def post_delete(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -108,6 +225,7 @@ def post_delete(request, post_id):
     return redirect('posts:profile', request.user.username)
 
 
+@query_budget(8)
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -120,6 +238,7 @@ def add_comment(request, post_id):
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(8)
 @login_required
 def delete_comment(request, comment_id):
     comment = get_object_or_404(Comment, id=comment_id)
@@ -128,20 +247,24 @@ def delete_comment(request, comment_id):
     return redirect('posts:post_detail', comment.post.pk)
 
 
+@query_budget(9)
 @login_required
 def follow_index(request):
-    posts = Post.objects.select_related('author').filter(
-        author__following__user=request.user)
-    page_obj = paging(request, posts)
+    entries = request.user.timeline.select_related('post__author',
+                                                   'post__group')
+    page_obj = paging(request, entries, cursor=settings.CURSOR_PAGING)
+    page_obj.object_list = [entry.post for entry in page_obj]
     context = {
         'page_obj': page_obj,
+        'suggestions': suggestions.for_user(request.user),
     }
     return render(request, 'posts/follow.html', context)
 
 
+@query_budget(25)
 @login_required
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_cached_or_404(User, username=username)
     if request.user != author:
         Follow.objects.get_or_create(
             user=request.user,
@@ -149,10 +272,9 @@ def profile_follow(request, username):
     return redirect('posts:profile', username)
 
 
+@query_budget(15)
 @login_required
 def profile_unfollow(request, username):
-    get_object_or_404(
-        Follow,
-        user=request.user,
-        author__username=username).delete()
+    author = get_cached_or_404(User, username=username)
+    get_object_or_404(Follow, user=request.user, author=author).delete()
     return redirect('posts:profile', username)
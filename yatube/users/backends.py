@@ -0,0 +1,21 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from core.cache import get_cached
+
+User = get_user_model()
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берет пользователя сессии из кеша.
+
+    Кеш сбрасывается сигналами при любом сохранении пользователя, в том
+    числе при смене пароля, поэтому проверка хеша сессии остается честной.
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = get_cached(User, pk=int(user_id))
+        except (User.DoesNotExist, ValueError, TypeError):
+            return None
+        return user if self.user_can_authenticate(user) else None
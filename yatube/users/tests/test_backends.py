@@ -0,0 +1,74 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+User = get_user_model()
+
+UNCACHED = {
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+    'AUTHENTICATION_BACKENDS': ['django.contrib.auth.backends.ModelBackend'],
+}
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='reader', password='GtaanGOO202_')
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='reader', password='GtaanGOO202_')
+
+    def count_queries(self, client):
+        """Запросы к БД на повторном открытии ленты подписок."""
+        url = reverse('posts:follow_index')
+        client.get(url)
+        with CaptureQueriesContext(connection) as context:
+            client.get(url)
+        return len(context.captured_queries)
+
+    def test_session_and_user_from_cache(self):
+        """Сессия и пользователь не читаются из базы на каждом запросе."""
+        cached = self.count_queries(self.client)
+        with override_settings(**UNCACHED):
+            client = Client()
+            client.login(username='reader', password='GtaanGOO202_')
+            uncached = self.count_queries(client)
+        self.assertEqual(uncached - cached, 2)
+
+    def test_user_edit_invalidates_cache(self):
+        """Изменения пользователя видны сразу."""
+        self.client.get(reverse('posts:follow_index'))
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(
+            response.wsgi_request.user.first_name, 'Новое имя')
+
+    def test_logout(self):
+        """После выхода пользователь анонимен."""
+        self.client.get(reverse('posts:follow_index'))
+        self.client.get(reverse('users:logout'))
+        response = self.client.get(reverse('posts:index'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля завершает остальные сессии."""
+        other = Client()
+        other.login(username='reader', password='GtaanGOO202_')
+        other.get(reverse('posts:follow_index'))
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'GtaanGOO202_',
+            'new_password1': 'NewPass_2021x',
+            'new_password2': 'NewPass_2021x',
+        })
+        response = self.client.get(reverse('posts:index'))
+        self.assertTrue(response.wsgi_request.user.is_authenticated)
+        response = other.get(reverse('posts:index'))
+        self.assertFalse(response.wsgi_request.user.is_authenticated)
@@ -1,4 +1,5 @@
 import os
+import sys
 
 from dotenv import load_dotenv
 
@@ -11,6 +12,8 @@ SECRET_KEY = '0!f2fpep!+c69p0%t_sfb(10%4@*j@-(s)rkh)*lqbin=h+1dn'
 
 DEBUG = False
 
+TESTING = 'test' in sys.argv or 'pytest' in sys.modules
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 
 ALLOWED_HOSTS = [
@@ -33,21 +36,27 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
     'sorl.thumbnail',
-    'debug_toolbar',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'debug_toolbar.middleware.DebugToolbarMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
 ]
 
+if DEBUG:
+    INSTALLED_APPS.append('debug_toolbar')
+    MIDDLEWARE.append('debug_toolbar.middleware.DebugToolbarMiddleware')
+
 INTERNAL_IPS = [
     '127.0.0.1',
 ]
@@ -72,6 +81,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.cache.timeouts',
             ],
         },
     },
@@ -90,6 +100,39 @@ DATABASES = {
     }
 }
 
+# Реплики только для чтения: через запятую хосты PostgreSQL или, для
+# локальной проверки, файлы SQLite. Остальные параметры берутся у
+# основной базы, в тестах реплики зеркалируют ее.
+_REPLICA_KEY = (
+    'NAME' if DATABASES['default']['ENGINE'].endswith('sqlite3') else 'HOST')
+
+_REPLICA_LOCATIONS = [
+    location.strip() for location in os.getenv('DB_REPLICAS', '').split(',')
+    if location.strip()
+]
+
+DATABASE_REPLICAS = [
+    f'replica{number}' for number in range(1, len(_REPLICA_LOCATIONS) + 1)]
+
+DATABASES.update({
+    alias: {
+        **DATABASES['default'],
+        _REPLICA_KEY: location,
+        'TEST': {'MIRROR': 'default'},
+    }
+    for alias, location in zip(DATABASE_REPLICAS, _REPLICA_LOCATIONS)
+})
+
+DATABASE_ROUTERS = ['core.db_router.ReplicaRouter']
+
+REPLICA_PIN_SECONDS = 10
+
+AUTHENTICATION_BACKENDS = [
+    'users.backends.CachedModelBackend',
+]
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -126,10 +169,45 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static/')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
     }
 }
 
+FEED_CACHE_TIMEOUT = 60 * 60 * 3
+
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+POST_CACHE_TIMEOUT = 60 * 60 * 24
+
+OBJECT_CACHE_TIMEOUT = 60 * 60 * 24
+
+OBJECT_CACHE_MISS_TIMEOUT = 60
+
+FOLLOWED_CACHE_TIMEOUT = 60 * 60 * 24
+
+POST_IMAGE_SIZE = (960, 400)
+
+POST_IMAGE_WIDTHS = (320, 640, 960)
+
+POST_IMAGE_SIZES = '(max-width: 576px) 100vw, 960px'
+
+POST_IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+POST_IMAGE_MAX_PIXELS = 50_000_000
+
+POST_IMAGE_MAX_SIDE = 2560
+
+SEARCH_CONFIG = 'russian'
+
+SEARCH_LIMIT = 1000
+
+SEARCH_GROUPS_LIMIT = 5
+
+THUMBNAIL_WORKERS = 2
+
 TEXT_LIMIT = 30
 
 STR_LIMIT = 15
@@ -138,8 +216,47 @@ UPDATETS_LIMIT = 10
 
 UPDATETS_LIMIT_TWO = 3
 
+COMMENTS_LIMIT = 20
+
+CURSOR_PAGING = False
+
+TIMELINE_BATCH_SIZE = 1000
+
+BULK_FOLLOW_LIMIT = 100
+
+SUGGESTIONS_LIMIT = 5
+
 TEST_PAGINATOR = 12
 
+QUERY_BUDGET_RAISE = TESTING
+
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', 0))
+
+PROFILING_DIR = os.getenv(
+    'PROFILING_DIR', os.path.join(BASE_DIR, 'profiles'))
+
+PROFILING_KEEP = 20
+
+PROFILING_TOKEN_MAX_AGE = 60 * 60 * 24
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.requests': {
+            'handlers': ['console'],
+            'level': os.getenv(
+                'REQUESTS_LOG_LEVEL', 'ERROR' if TESTING else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 LOGIN_URL = 'users:login'
 
 LOGIN_REDIRECT_URL = 'posts:index'